@@ -0,0 +1,30 @@
+"""Add indexes for /plants technology and status filters
+
+Revision ID: 3b8f0e6d2a94
+Revises: e4a9d1c7b350
+Create Date: 2025-04-20 16:05:37.214886
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8f0e6d2a94'
+down_revision: Union[str, None] = 'e4a9d1c7b350'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_generators_technology_status', 'generators', ['technology', 'status', 'plant_code'],
+                    unique=False, postgresql_include=['nameplate_capacity_mw'])
+    op.create_index('ix_plant_capacity_technology', 'plant_capacity', ['technology', 'plant_code'],
+                    unique=False, postgresql_include=['nameplate_capacity_mw'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_plant_capacity_technology', table_name='plant_capacity')
+    op.drop_index('ix_generators_technology_status', table_name='generators')
@@ -0,0 +1,41 @@
+"""Add plant_capacity summary table
+
+Revision ID: 5c3e1f9a7b21
+Revises: a20cdf89cc5e
+Create Date: 2025-03-02 18:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c3e1f9a7b21'
+down_revision: Union[str, None] = 'a20cdf89cc5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('plant_capacity',
+    sa.Column('plant_code', sa.Integer(), nullable=False),
+    sa.Column('technology', sa.String(), nullable=False),
+    sa.Column('nameplate_capacity_mw', sa.Float(), nullable=True),
+    sa.Column('generator_count', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['plant_code'], ['plants.plant_code'], ),
+    sa.PrimaryKeyConstraint('plant_code', 'technology')
+    )
+    # Populate from whatever generators are already loaded; the loader keeps it fresh after this.
+    op.execute("""
+        INSERT INTO plant_capacity (plant_code, technology, nameplate_capacity_mw, generator_count)
+        SELECT plant_code, technology, SUM(COALESCE(nameplate_capacity_mw, 0)), COUNT(*)
+        FROM generators
+        WHERE technology IS NOT NULL
+        GROUP BY plant_code, technology
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('plant_capacity')
@@ -0,0 +1,34 @@
+"""Add GiST-indexed location point to plants
+
+Revision ID: 8d4b2a6c0e13
+Revises: 5c3e1f9a7b21
+Create Date: 2025-03-09 11:47:03.552981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4b2a6c0e13'
+down_revision: Union[str, None] = '5c3e1f9a7b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Native Postgres point + GiST rather than PostGIS: bbox containment is all /plants
+    # needs, and this works on any Postgres 12+ without installing an extension.
+    # IF NOT EXISTS because scripts/load_eia860_data.py may already have added them.
+    op.execute("""
+        ALTER TABLE plants ADD COLUMN IF NOT EXISTS location POINT
+            GENERATED ALWAYS AS (point(longitude, latitude)) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_plants_location ON plants USING gist (location)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_plants_location', table_name='plants')
+    op.drop_column('plants', 'location')
@@ -0,0 +1,32 @@
+"""Add row_hash to utilities, plants and generators for incremental loads
+
+Revision ID: 9f2c6a1d4e87
+Revises: 3b8f0e6d2a94
+Create Date: 2025-05-04 10:42:19.538201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f2c6a1d4e87'
+down_revision: Union[str, None] = '3b8f0e6d2a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by scripts/load_eia860_data.py (md5 of the loaded values); existing rows are
+    # hashed by the next --incremental run
+    op.add_column('utilities', sa.Column('row_hash', sa.Text(), nullable=True))
+    op.add_column('plants', sa.Column('row_hash', sa.Text(), nullable=True))
+    op.add_column('generators', sa.Column('row_hash', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('generators', 'row_hash')
+    op.drop_column('plants', 'row_hash')
+    op.drop_column('utilities', 'row_hash')
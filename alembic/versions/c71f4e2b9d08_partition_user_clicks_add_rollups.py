@@ -0,0 +1,106 @@
+"""Partition user_clicks by month, add BRIN index and hourly rollups
+
+Revision ID: c71f4e2b9d08
+Revises: 8d4b2a6c0e13
+Create Date: 2025-04-06 15:21:58.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71f4e2b9d08'
+down_revision: Union[str, None] = '8d4b2a6c0e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Postgres can't partition an existing table, so build a partitioned copy and move the rows over.
+    op.execute("ALTER TABLE user_clicks RENAME TO user_clicks_unpartitioned")
+    op.execute("ALTER INDEX IF EXISTS ix_user_clicks_click_id RENAME TO ix_user_clicks_unpartitioned_click_id")
+    op.execute("ALTER TABLE user_clicks_unpartitioned RENAME CONSTRAINT user_clicks_pkey TO user_clicks_unpartitioned_pkey")
+    op.execute("""
+        CREATE TABLE user_clicks (
+            click_id INTEGER NOT NULL DEFAULT nextval('user_clicks_click_id_seq'),
+            click_time TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            latitude DOUBLE PRECISION NOT NULL,
+            longitude DOUBLE PRECISION NOT NULL,
+            PRIMARY KEY (click_id, click_time)
+        ) PARTITION BY RANGE (click_time)
+    """)
+    op.execute("ALTER SEQUENCE user_clicks_click_id_seq OWNED BY user_clicks.click_id")
+    op.execute("CREATE TABLE user_clicks_default PARTITION OF user_clicks DEFAULT")
+
+    # One partition per month from the oldest click through three months from now;
+    # the app keeps creating upcoming months while it runs (click_rollups.maintain_click_partitions).
+    op.execute("""
+        DO $$
+        DECLARE
+            month DATE;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', LEAST(COALESCE(MIN(click_time), now()), now()) AT TIME ZONE 'UTC'),
+                    date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months',
+                    interval '1 month'
+                )::date
+                FROM user_clicks_unpartitioned
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE user_clicks_%s PARTITION OF user_clicks FOR VALUES FROM (%L) TO (%L)',
+                    -- timestamptz bounds at UTC midnight, not the session's time zone
+                    to_char(month, 'YYYYMM'),
+                    month::timestamp AT TIME ZONE 'UTC',
+                    (month + interval '1 month') AT TIME ZONE 'UTC'
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute("""
+        INSERT INTO user_clicks (click_id, click_time, latitude, longitude)
+        SELECT click_id, COALESCE(click_time, now()), latitude, longitude
+        FROM user_clicks_unpartitioned
+    """)
+    op.execute("DROP TABLE user_clicks_unpartitioned")
+    # Clicks arrive in time order, so a tiny BRIN index covers time-range scans
+    op.create_index('ix_user_clicks_click_time_brin', 'user_clicks', ['click_time'], postgresql_using='brin')
+
+    op.create_table('user_click_rollups',
+    sa.Column('hour', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('cell_lat', sa.Integer(), nullable=False),
+    sa.Column('cell_lng', sa.Integer(), nullable=False),
+    sa.Column('click_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('hour', 'cell_lat', 'cell_lng')
+    )
+    # 0.1 degree cells, matching CLICK_ROLLUP_CELL_DEG
+    op.execute("""
+        INSERT INTO user_click_rollups (hour, cell_lat, cell_lng, click_count)
+        SELECT date_trunc('hour', click_time AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+               floor(latitude / 0.1)::int, floor(longitude / 0.1)::int, COUNT(*)
+        FROM user_clicks
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('user_click_rollups')
+    op.execute("ALTER TABLE user_clicks RENAME TO user_clicks_partitioned")
+    op.execute("""
+        CREATE TABLE user_clicks (
+            click_id INTEGER NOT NULL DEFAULT nextval('user_clicks_click_id_seq') PRIMARY KEY,
+            click_time TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            latitude DOUBLE PRECISION NOT NULL,
+            longitude DOUBLE PRECISION NOT NULL
+        )
+    """)
+    op.execute("""
+        INSERT INTO user_clicks (click_id, click_time, latitude, longitude)
+        SELECT click_id, click_time, latitude, longitude FROM user_clicks_partitioned
+    """)
+    op.execute("ALTER SEQUENCE user_clicks_click_id_seq OWNED BY user_clicks.click_id")
+    op.execute("DROP TABLE user_clicks_partitioned")
+    op.create_index('ix_user_clicks_click_id', 'user_clicks', ['click_id'], unique=False)
@@ -0,0 +1,33 @@
+"""Add data_version table
+
+Revision ID: e4a9d1c7b350
+Revises: c71f4e2b9d08
+Create Date: 2025-04-13 10:47:22.391570
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9d1c7b350'
+down_revision: Union[str, None] = 'c71f4e2b9d08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('data_version',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Whatever is loaded already counts as version 1; the loader bumps it from here.
+    op.execute("INSERT INTO data_version (name, version) VALUES ('eia860', 1)")
+
+
+def downgrade() -> None:
+    op.drop_table('data_version')
@@ -1,26 +1,151 @@
 import argparse
+import json
+
 import pandas as pd
 
-# Set up argument parsing
-parser = argparse.ArgumentParser(description="Read CSV file and check columns for nulls and empty values.")
-parser.add_argument('filename', type=str, help="Path to the CSV file")
-args = parser.parse_args()
-
-# Read the CSV file with two header lines
-df = pd.read_csv(args.filename, header=1, low_memory=False)
-
-# Check for columns with null, empty values, or pure white space
-for col in df.columns:
-    # Count NULL values
-    null_count = df[col].isnull().sum()
-    
-    # Count empty or whitespace values (convert to string and strip whitespaces)
-    whitespace_count = (df[col].astype(str).str.strip() == '').sum()
-    
-    # Total count of NULL, empty, or whitespace values
-    total_invalid = null_count + whitespace_count
-    
-    if total_invalid > 0:
-        print(f"Column '{col}' has {total_invalid} NULL, empty, or whitespace values.")
-    else:
-        print(f"Column '{col}' has no NULL, empty, or whitespace values.")
+# Profile every column of an EIA-860 CSV: null, whitespace-only, distinct counts,
+# min/max and an inferred type.
+# Columns are profiled together, one chunk at a time, so files larger than memory
+# can be checked, and whitespace is detected with str.isspace() rather than by
+# stripping a full string copy of every column.
+
+
+class CsvProfile:
+    def __init__(self, max_distinct=100000):
+        self.max_distinct = max_distinct
+        self.rows = 0
+        self.columns = None
+        self.stats = {}
+
+    def update(self, df):
+        """Fold one chunk (all columns read as strings, empty cells as NaN) into the profile."""
+        if self.columns is None:
+            self.columns = list(df.columns)
+            for col in self.columns:
+                self.stats[col] = {
+                    'nulls': 0, 'whitespace': 0, 'numeric': 0, 'integral': True,
+                    'min_number': None, 'max_number': None, 'min_text': None, 'max_text': None,
+                    'distinct': set(), 'distinct_capped': False,
+                }
+        self.rows += len(df)
+
+        whitespace = df.apply(lambda s: s.str.isspace().eq(True))
+        values = df.mask(whitespace)  # only real values from here on
+        numbers = values.apply(pd.to_numeric, errors='coerce')
+        numeric_mask = numbers.notna()
+        text = values.mask(numeric_mask)
+
+        nulls = df.isna().sum()
+        whitespace_counts = whitespace.sum()
+        numeric_counts = numeric_mask.sum()
+        integral = ((numbers % 1 == 0) | ~numeric_mask).all()
+        min_number, max_number = numbers.min(), numbers.max()
+        # Per column over the remaining strings only: text still holds NaN for nulls and for
+        # numeric cells, and str/float comparisons would raise
+        min_text, max_text = {}, {}
+        for col in self.columns:
+            strings = text[col].dropna()
+            if not strings.empty:
+                min_text[col], max_text[col] = strings.min(), strings.max()
+
+        for col in self.columns:
+            st = self.stats[col]
+            st['nulls'] += int(nulls[col])
+            st['whitespace'] += int(whitespace_counts[col])
+            st['numeric'] += int(numeric_counts[col])
+            st['integral'] = st['integral'] and bool(integral[col])
+            st['min_number'] = _combine(min, st['min_number'], min_number[col])
+            st['max_number'] = _combine(max, st['max_number'], max_number[col])
+            st['min_text'] = _combine(min, st['min_text'], min_text.get(col))
+            st['max_text'] = _combine(max, st['max_text'], max_text.get(col))
+            if not st['distinct_capped']:
+                st['distinct'].update(values[col].dropna().unique())
+                if len(st['distinct']) > self.max_distinct:
+                    st['distinct'] = set()
+                    st['distinct_capped'] = True
+
+    def report(self):
+        columns = {}
+        for col in self.columns or []:
+            st = self.stats[col]
+            present = self.rows - st['nulls'] - st['whitespace']
+            if present == 0:
+                inferred = 'empty'
+            elif st['numeric'] == present:
+                inferred = 'integer' if st['integral'] else 'float'
+            elif st['numeric'] > 0:
+                inferred = 'mixed'
+            else:
+                inferred = 'string'
+            numeric_type = inferred in ('integer', 'float')
+            columns[col] = {
+                'type': inferred,
+                'nulls': st['nulls'],
+                'whitespace': st['whitespace'],
+                'blank': st['nulls'] + st['whitespace'],
+                'distinct': None if st['distinct_capped'] else len(st['distinct']),
+                'min': st['min_number'] if numeric_type else st['min_text'],
+                'max': st['max_number'] if numeric_type else st['max_text'],
+            }
+        return {'rows': self.rows, 'columns': columns}
+
+
+def _combine(pick, current, new):
+    if pd.isna(new):
+        return current
+    new = new.item() if hasattr(new, 'item') else new  # numpy scalar -> Python, for JSON
+    return new if current is None else pick(current, new)
+
+
+def profile_csv(filename, chunksize=100000, max_distinct=100000, header=1):
+    """
+    Profile a CSV file chunk by chunk.
+
+    Parameters:
+        filename (str): Path to the CSV file.
+        chunksize (int): Rows per chunk.
+        max_distinct (int): Stop counting distinct values of a column past this many.
+        header (int): Row holding the column names (EIA-860 files have a title line first).
+
+    Returns:
+        dict: {"rows": n, "columns": {name: {type, nulls, whitespace, blank, distinct, min, max}}}
+    """
+    profile = CsvProfile(max_distinct)
+    reader = pd.read_csv(
+        filename, header=header, dtype=str, keep_default_na=False, na_values=[''],
+        chunksize=chunksize
+    )
+    for chunk in reader:
+        profile.update(chunk)
+    return profile.report()
+
+
+def main():
+    # Set up argument parsing
+    parser = argparse.ArgumentParser(description="Read CSV file and check columns for nulls and empty values.")
+    parser.add_argument('filename', type=str, help="Path to the CSV file")
+    parser.add_argument('--chunksize', type=int, default=100000, help="Rows read per chunk")
+    parser.add_argument('--max-distinct', type=int, default=100000,
+                        help="Stop counting distinct values of a column past this many")
+    parser.add_argument('--json', metavar='PATH', help="Also write the full profile as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    report = profile_csv(args.filename, args.chunksize, args.max_distinct)
+
+    if args.json == '-':
+        print(json.dumps(report, indent=2, default=str))
+        return
+
+    for col, st in report['columns'].items():
+        if st['blank'] > 0:
+            print(f"Column '{col}' has {st['blank']} NULL, empty, or whitespace values.")
+        else:
+            print(f"Column '{col}' has no NULL, empty, or whitespace values.")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"Wrote profile of {report['rows']} rows to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
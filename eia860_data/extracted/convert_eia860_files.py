@@ -1,18 +1,148 @@
-import pandas as pd
+import argparse
+import datetime
 
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
 
+# Convert the EIA-860 workbooks to CSV (the original format) or to typed Parquet.
+# Parquet output is streamed from the sheet with openpyxl's read-only mode, so the
+# workbook is never fully loaded, and numeric columns are stored as numbers so the
+# loader doesn't have to re-parse strings on every load.
 
 # List of .xlsx files to process
 files = ['1___Utility_Y2023.xlsx', '2___Plant_Y2023.xlsx', '3_1_Generator_Y2023.xlsx']
 
-# Loop through each file in the list
-for file in files:
-    # Load the .xlsx file
+# Column types for Parquet output; any column not listed is stored as a string
+PARQUET_TYPES = {
+    'Utility ID': pa.int64(),
+    'Plant Code': pa.int64(),
+    'Zip': pa.string(),
+    'Latitude': pa.float64(),
+    'Longitude': pa.float64(),
+    'Nameplate Capacity (MW)': pa.float64(),
+    'Summer Capacity (MW)': pa.float64(),
+    'Winter Capacity (MW)': pa.float64(),
+    'Minimum Load (MW)': pa.float64(),
+    'Operating Month': pa.int64(),
+    'Operating Year': pa.int64(),
+}
+
+BATCH_ROWS = 10000
+
+
+def normalize_text(value):
+    """Strip surrounding whitespace from a string cell; both output formats apply this."""
+    return value.strip() if isinstance(value, str) else value
+
+
+def normalize_headers(cells):
+    """
+    Column names from a sheet's header row, the same for CSV and Parquet output: stripped,
+    empty cells as "", and repeated names suffixed ".1", ".2", ... so each is unique.
+    """
+    names, seen = [], {}
+    for cell in cells:
+        name = '' if cell is None or pd.isna(cell) else str(normalize_text(cell))
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def to_csv(file):
+    # Load the .xlsx file (row 1, the title, becomes pandas' header; row 2 holds the column names)
     df = pd.read_excel(file)
-    
+    # Same text cleanup as the Parquet path, so both formats load identical values
+    df = df.map(normalize_text)
+    if len(df):
+        df.iloc[0] = normalize_headers(df.iloc[0])
+
     # Convert to CSV
     csv_file = file.replace('.xlsx', '.csv')
     df.to_csv(csv_file, index=False)
-    
-    print(f"Processed {file} -> {csv_file}")
+    return csv_file
+
+
+def convert_cell(value, arrow_type):
+    """Coerce an openpyxl cell value to the column's Arrow type; blanks and junk become None."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = normalize_text(value)
+        if value == '':
+            return None
+    if pa.types.is_string(arrow_type):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)  # e.g. IDs stored as numbers in some sheets
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        return str(value)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if pa.types.is_integer(arrow_type):
+        return int(number) if number.is_integer() else None
+    return number
+
+
+def to_parquet(file):
+    """
+    Stream the first sheet of an EIA-860 workbook into a typed Parquet file.
+
+    The sheet's title line (row 1) is kept in the Parquet schema metadata and the
+    column names come from row 2, matching the CSV layout the loader expects.
+    """
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        title = next(rows)[0]
+        headers = normalize_headers(next(rows))
+        schema = pa.schema(
+            [pa.field(h, PARQUET_TYPES.get(h, pa.string())) for h in headers],
+            metadata={'title': str(title or '')}
+        )
+
+        parquet_file = file.replace('.xlsx', '.parquet')
+        with pq.ParquetWriter(parquet_file, schema) as writer:
+            batch = []
+            for row in rows:
+                if all(value is None for value in row):
+                    continue
+                batch.append(row)
+                if len(batch) >= BATCH_ROWS:
+                    writer.write_batch(rows_to_batch(batch, schema))
+                    batch = []
+            if batch:
+                writer.write_batch(rows_to_batch(batch, schema))
+    finally:
+        wb.close()
+    return parquet_file
+
+
+def rows_to_batch(rows, schema):
+    columns = [
+        pa.array([convert_cell(row[i] if i < len(row) else None, field.type) for row in rows], type=field.type)
+        for i, field in enumerate(schema)
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert EIA-860 workbooks to CSV or Parquet.")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    args = parser.parse_args()
+
+    # Loop through each file in the list
+    for file in files:
+        out_file = to_parquet(file) if args.format == 'parquet' else to_csv(file)
+        print(f"Processed {file} -> {out_file}")
+
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+
+from sqlalchemy import insert
+
+from . import models, database
+from .click_rollups import upsert_rollups
+from .config import (
+    CLICK_BATCH_SIZE, CLICK_FLUSH_INTERVAL_S, CLICK_QUEUE_SIZE, CLICK_RETRY_BATCHES, CLICK_DEAD_LETTER_PATH
+)
+
+# Buffered writes for /clicks. Clicks are queued in-process and a background task
+# writes them as one multi-row INSERT per batch, flushing when a batch fills up or
+# CLICK_FLUSH_INTERVAL_S after its first click, whichever comes first. Batches that fail
+# to write (e.g. the database is briefly down) are kept and retried after the next
+# successful flush; past CLICK_RETRY_BATCHES of them, and at shutdown, leftovers go to a
+# dead-letter file rather than being dropped.
+
+
+async def write_clicks(db, rows):
+    """
+    Insert click rows in a single statement, add them to the hotspot rollup, and commit.
+
+    Parameters:
+        db (AsyncSession): Database session.
+        rows (list): Dicts with latitude, longitude and click_time.
+    """
+    await db.execute(insert(models.UserClick), rows)
+    await upsert_rollups(db, rows)
+    await db.commit()
+
+
+_STOP = object()  # queued by stop() after the last click
+
+
+class ClickBuffer:
+    def __init__(self, batch_size=CLICK_BATCH_SIZE, flush_interval=CLICK_FLUSH_INTERVAL_S, queue_size=CLICK_QUEUE_SIZE,
+                 retry_batches=CLICK_RETRY_BATCHES, dead_letter_path=CLICK_DEAD_LETTER_PATH):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.retry_batches = retry_batches
+        self.dead_letter_path = dead_letter_path
+        self._queue = None
+        self._task = None
+        self._failed = deque()  # batches waiting to be retried, oldest first
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Write whatever is still queued, then stop the background task."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def submit(self, rows):
+        # Waits when the queue is full, pushing back on clients instead of growing without bound
+        for row in rows:
+            await self._queue.put(row)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            if await self._flush(batch):
+                await self._retry_failed()
+        # Last chance for earlier failures; whatever still can't be written is kept on disk
+        await self._retry_failed()
+        while self._failed:
+            self._dead_letter(self._failed.popleft())
+
+    async def _write(self, batch):
+        try:
+            async with database.AsyncSessionLocal() as db:
+                await write_clicks(db, batch)
+            return True
+        except Exception as e:
+            logging.error(f"Failed to write {len(batch)} buffered clicks: {e}")
+            return False
+
+    async def _flush(self, batch):
+        if await self._write(batch):
+            return True
+        self._failed.append(batch)
+        if len(self._failed) > self.retry_batches:
+            self._dead_letter(self._failed.popleft())
+        return False
+
+    async def _retry_failed(self):
+        # Oldest first; stop at the first failure, since the database is likely still unavailable
+        while self._failed:
+            if not await self._write(self._failed[0]):
+                return
+            self._failed.popleft()
+
+    def _dead_letter(self, batch):
+        try:
+            if os.path.dirname(self.dead_letter_path):
+                os.makedirs(os.path.dirname(self.dead_letter_path), exist_ok=True)
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                for row in batch:
+                    f.write(json.dumps(dict(row, click_time=row["click_time"].isoformat())) + "\n")
+            logging.warning(f"Wrote {len(batch)} unwritten clicks to {self.dead_letter_path}")
+        except OSError as e:
+            logging.error(f"Lost {len(batch)} clicks: could not write {self.dead_letter_path}: {e}")
+
+
+click_buffer = ClickBuffer()
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import math
+from collections import Counter
+from datetime import date, datetime, timezone
+
+from sqlalchemy import select, func, text, null
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from . import models
+from .config import CLICK_PARTITION_MONTHS_AHEAD, CLICK_PARTITION_CHECK_INTERVAL_S, CLICK_ROLLUP_CELL_DEG
+
+# Storage helpers for user clicks: monthly partitions of user_clicks, and the
+# user_click_rollups table of click counts per grid cell per hour that backs
+# /clicks/hotspots without scanning the raw click history.
+
+
+def as_utc(value):
+    """Convert a datetime to UTC; naive times are taken as UTC already."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def click_hour(click_time):
+    """Truncate a click time to its UTC hour."""
+    return as_utc(click_time).replace(minute=0, second=0, microsecond=0)
+
+
+def click_cell(latitude, longitude):
+    return math.floor(latitude / CLICK_ROLLUP_CELL_DEG), math.floor(longitude / CLICK_ROLLUP_CELL_DEG)
+
+
+async def upsert_rollups(db, rows):
+    """
+    Add click rows to the hourly grid-cell rollup, in the caller's transaction.
+
+    Parameters:
+        db (AsyncSession): Database session.
+        rows (list): Dicts with latitude, longitude and click_time.
+    """
+    counts = Counter(
+        (click_hour(row["click_time"]),) + click_cell(row["latitude"], row["longitude"])
+        for row in rows
+    )
+    stmt = pg_insert(models.UserClickRollup).values([
+        {"hour": hour, "cell_lat": cell_lat, "cell_lng": cell_lng, "click_count": count}
+        for (hour, cell_lat, cell_lng), count in counts.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["hour", "cell_lat", "cell_lng"],
+        set_={"click_count": models.UserClickRollup.click_count + stmt.excluded.click_count},
+    )
+    await db.execute(stmt)
+
+
+def _add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def _partition_exists(conn, name):
+    return (await conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})).scalar()
+
+
+async def create_month_partition(conn, month):
+    """
+    Create the user_clicks partition for one month, if it doesn't exist yet.
+
+    Clicks for that month may already have landed in the default partition, in which case
+    Postgres refuses the new partition. The default partition is then detached, its rows for
+    the month moved into the new partition, and reattached, all in the caller's transaction.
+
+    Parameters:
+        conn (AsyncConnection): Connection in a transaction.
+        month (date): First day of the month.
+
+    Returns:
+        bool: True if the partition was created.
+    """
+    name = f"user_clicks_{month:%Y%m}"
+    if await _partition_exists(conn, name):
+        return False
+    # Explicit UTC offsets, so the bounds don't depend on the session's TimeZone
+    start = f"{month.isoformat()} 00:00:00+00"
+    end = f"{_add_months(month, 1).isoformat()} 00:00:00+00"
+    in_month = "click_time >= CAST(:start AS timestamptz) AND click_time < CAST(:end AS timestamptz)"
+    bounds = {"start": start, "end": end}
+
+    stray = (await conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM user_clicks_default WHERE {in_month})"), bounds
+    )).scalar()
+    if stray:
+        await conn.execute(text("ALTER TABLE user_clicks DETACH PARTITION user_clicks_default"))
+    await conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF user_clicks FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+    if stray:
+        moved = await conn.execute(text(
+            f"WITH moved AS (DELETE FROM user_clicks_default WHERE {in_month} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), bounds)
+        await conn.execute(text("ALTER TABLE user_clicks ATTACH PARTITION user_clicks_default DEFAULT"))
+        logging.warning(f"Moved {moved.rowcount} clicks from user_clicks_default into {name}")
+    return True
+
+
+async def maintain_click_partitions(engine, months_ahead=CLICK_PARTITION_MONTHS_AHEAD):
+    """
+    Make sure the default partition and the monthly user_clicks partitions from this month
+    through months_ahead months from now exist. Each month gets its own transaction, so one
+    failure doesn't undo the others.
+    """
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE IF NOT EXISTS user_clicks_default PARTITION OF user_clicks DEFAULT"))
+    except Exception as e:
+        # e.g. user_clicks hasn't been migrated to a partitioned table yet
+        logging.error(f"Could not create user_clicks partitions: {e}")
+        return
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    for n in range(months_ahead + 1):
+        month = _add_months(this_month, n)
+        try:
+            async with engine.begin() as conn:
+                if await create_month_partition(conn, month):
+                    logging.info(f"Created user_clicks partition for {month:%Y-%m}")
+        except Exception as e:
+            logging.error(f"Could not create user_clicks partition for {month:%Y-%m}: {e}")
+
+
+async def run_partition_maintenance(engine, interval=CLICK_PARTITION_CHECK_INTERVAL_S):
+    """Background task: create upcoming partitions now and then every interval seconds, so a
+    long-running server never runs past the last partition it made."""
+    while True:
+        await maintain_click_partitions(engine)
+        await asyncio.sleep(interval)
+
+
+def hotspots_query(bbox, start, end, by_hour=False):
+    """
+    Build a select of click counts per grid cell (and optionally per hour) from the rollup.
+
+    Parameters:
+        bbox (BBox): Bounding box of cells to include.
+        start, end (datetime): Time range, start inclusive and end exclusive.
+        by_hour (bool): Keep hours separate instead of summing over the range.
+
+    Returns:
+        Select: statement yielding (cell_lat, cell_lng, hour or None, click_count).
+    """
+    rollup = models.UserClickRollup
+    min_lat, min_lng = click_cell(bbox.south, bbox.west)
+    max_lat, max_lng = click_cell(bbox.north, bbox.east)
+    group = [rollup.cell_lat, rollup.cell_lng] + ([rollup.hour] if by_hour else [])
+    return select(
+        rollup.cell_lat,
+        rollup.cell_lng,
+        rollup.hour if by_hour else null(),
+        func.sum(rollup.click_count),
+    ).where(
+        rollup.hour >= click_hour(start),
+        rollup.hour < end,
+        rollup.cell_lat.between(min_lat, max_lat),
+        rollup.cell_lng.between(min_lng, max_lng),
+    ).group_by(*group).order_by(*group)
+
+
+def hotspot_rows_to_dicts(rows):
+    return [
+        {
+            # centre of the grid cell
+            "latitude": (cell_lat + 0.5) * CLICK_ROLLUP_CELL_DEG,
+            "longitude": (cell_lng + 0.5) * CLICK_ROLLUP_CELL_DEG,
+            "hour": hour,
+            "click_count": int(count),
+        }
+        for cell_lat, cell_lng, hour, count in rows
+    ]
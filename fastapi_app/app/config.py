@@ -0,0 +1,57 @@
+import os
+
+# Runtime settings for the FastAPI service, read from the environment.
+
+# How /plants answers bounding-box queries:
+#   "db"      - join Plant, Utility and Generator in Postgres on every request (default)
+#   "summary" - read the pre-aggregated plant_capacity table built by the loader
+#   "index"   - load everything into an in-memory spatial index at startup and serve from it
+PLANTS_BACKEND = os.getenv("CLIMATECHROMA_PLANTS_BACKEND", "db")
+
+# Cell size, in degrees, of the in-memory plant grid index.
+PLANT_INDEX_CELL_DEG = float(os.getenv("CLIMATECHROMA_PLANT_INDEX_CELL_DEG", "1.0"))
+
+# How /plants filters by bounding box in SQL:
+#   "point" - containment test on the GiST-indexed plants.location column (default)
+#   "range" - separate latitude/longitude range filters, for databases without the location column
+PLANTS_BBOX_FILTER = os.getenv("CLIMATECHROMA_PLANTS_BBOX_FILTER", "point")
+
+# Number of encoded vector tiles kept in the in-memory tile cache.
+TILE_CACHE_SIZE = int(os.getenv("CLIMATECHROMA_TILE_CACHE_SIZE", "2048"))
+
+# Async database engine pool settings
+DB_POOL_SIZE = int(os.getenv("CLIMATECHROMA_DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("CLIMATECHROMA_DB_MAX_OVERFLOW", "20"))
+DB_POOL_PRE_PING = os.getenv("CLIMATECHROMA_DB_POOL_PRE_PING", "1") == "1"
+
+# Buffered /clicks ingestion: when enabled, clicks are queued in-process and written in batches
+CLICK_BUFFER_ENABLED = os.getenv("CLIMATECHROMA_CLICK_BUFFER", "0") == "1"
+CLICK_BATCH_SIZE = int(os.getenv("CLIMATECHROMA_CLICK_BATCH_SIZE", "500"))
+CLICK_FLUSH_INTERVAL_S = float(os.getenv("CLIMATECHROMA_CLICK_FLUSH_INTERVAL_S", "1.0"))
+CLICK_QUEUE_SIZE = int(os.getenv("CLIMATECHROMA_CLICK_QUEUE_SIZE", "10000"))
+# Batches that failed to write are retried with later flushes; past this many, or at shutdown,
+# they are appended to the dead-letter file (JSON lines) instead of being dropped
+CLICK_RETRY_BATCHES = int(os.getenv("CLIMATECHROMA_CLICK_RETRY_BATCHES", "20"))
+CLICK_DEAD_LETTER_PATH = os.getenv("CLIMATECHROMA_CLICK_DEAD_LETTER_PATH", os.path.join("data", "click_dead_letter.jsonl"))
+# POST /clicks/batch limits: clicks per request, and how far a client-supplied click_time
+# may lie in the past or future (anything else would land outside the current partitions)
+CLICK_BATCH_MAX_CLICKS = int(os.getenv("CLIMATECHROMA_CLICK_BATCH_MAX_CLICKS", "1000"))
+CLICK_TIME_MAX_AGE_S = float(os.getenv("CLIMATECHROMA_CLICK_TIME_MAX_AGE_S", "3600"))
+CLICK_TIME_MAX_AHEAD_S = float(os.getenv("CLIMATECHROMA_CLICK_TIME_MAX_AHEAD_S", "300"))
+
+# user_clicks partition maintenance and hotspot rollups
+CLICK_PARTITION_MONTHS_AHEAD = int(os.getenv("CLIMATECHROMA_CLICK_PARTITION_MONTHS_AHEAD", "3"))
+CLICK_PARTITION_CHECK_INTERVAL_S = float(os.getenv("CLIMATECHROMA_CLICK_PARTITION_CHECK_INTERVAL_S", str(6 * 3600)))
+CLICK_ROLLUP_CELL_DEG = 0.1  # baked into user_click_rollups; changing it means rebuilding the table
+
+# /plants HTTP caching: how long the data version read from the database is trusted before
+# re-checking it, and the max-age sent to browsers and proxies with each response
+DATA_VERSION_TTL_S = float(os.getenv("CLIMATECHROMA_DATA_VERSION_TTL_S", "5"))
+PLANTS_CACHE_MAX_AGE = int(os.getenv("CLIMATECHROMA_PLANTS_CACHE_MAX_AGE", "300"))
+
+# Per-grid-cell cache of /plants results for the "db" and "summary" backends (0 entries disables it)
+PLANT_CELL_CACHE_ENTRIES = int(os.getenv("CLIMATECHROMA_PLANT_CELL_CACHE_ENTRIES", "4096"))
+PLANT_CELL_CACHE_MB = float(os.getenv("CLIMATECHROMA_PLANT_CELL_CACHE_MB", "64"))
+
+# Responses smaller than this many bytes are sent uncompressed (gzip, or brotli when brotli-asgi is installed)
+COMPRESSION_MIN_BYTES = int(os.getenv("CLIMATECHROMA_COMPRESSION_MIN_BYTES", "1000"))
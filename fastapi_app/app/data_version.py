@@ -0,0 +1,77 @@
+import hashlib
+import time
+
+from sqlalchemy import select
+
+from . import models
+from .config import DATA_VERSION_TTL_S
+
+# The loader bumps data_version.version whenever it changes the EIA-860 tables
+# (scripts/load_eia860_data.refresh_plant_capacity). The API keys cached responses,
+# ETags and the in-memory plant index on it, so they all change exactly when the data does.
+
+EIA860_DATA = "eia860"
+
+_cached = {"version": None, "checked_at": 0.0}
+
+
+def data_version_query(name=EIA860_DATA):
+    return select(models.DataVersion.version).where(models.DataVersion.name == name)
+
+
+def read_data_version(db):
+    """Read the current data version with a synchronous session (0 if the loader never ran)."""
+    return db.execute(data_version_query()).scalar() or 0
+
+
+def _expired():
+    return _cached["version"] is None or time.monotonic() - _cached["checked_at"] >= DATA_VERSION_TTL_S
+
+
+def _remember(version):
+    _cached["version"] = version or 0
+    _cached["checked_at"] = time.monotonic()
+    return _cached["version"]
+
+
+async def current_data_version(db):
+    """
+    Return the current data version, re-reading it at most every DATA_VERSION_TTL_S seconds.
+
+    Parameters:
+        db (AsyncSession): Database session.
+
+    Returns:
+        int: Data version.
+    """
+    if _expired():
+        return _remember((await db.execute(data_version_query())).scalar())
+    return _cached["version"]
+
+
+def current_data_version_sync(db):
+    """current_data_version() for synchronous sessions (the threadpool routers)."""
+    if _expired():
+        return _remember(read_data_version(db))
+    return _cached["version"]
+
+
+def invalidate_data_version():
+    _cached["version"] = None
+
+
+def make_etag(*parts):
+    """Build a strong ETag from the parts that determine a response's content."""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value matches etag (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
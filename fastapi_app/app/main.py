@@ -1,14 +1,35 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Header, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, Column, Integer, String, ForeignKey, Float
 from sqlalchemy.orm import relationship
 
 from fastapi_app.app import schemas
-from fastapi_app.app.routers import clicks
+from fastapi_app.app.routers import clicks, plant_layers, tiles
 from . import models, database
+from .click_buffer import click_buffer
+from .click_rollups import run_partition_maintenance
+from .config import PLANTS_BACKEND, CLICK_BUFFER_ENABLED, PLANTS_CACHE_MAX_AGE, COMPRESSION_MIN_BYTES
+from .data_version import current_data_version, invalidate_data_version, make_etag, etag_matches
+from .plant_cell_cache import plant_cell_cache
+from .plant_formats import plants_to_columns, plants_to_arrow, ARROW_STREAM_MEDIA_TYPE
+from .plant_index import plant_index, refresh_plant_index
+from .plant_streaming import stream_plant_records, prefetch_first, ndjson_lines, NDJSON_MEDIA_TYPE
+from .plant_queries import (
+    BBox, PlantFilter, plant_rows_query, aggregate_plant_rows, plant_capacity_query, aggregate_capacity_rows
+)
+import asyncio
 import logging
-from typing import List
+from typing import List, Optional
+
+try:
+    # Optional: brotli compresses JSON noticeably better than gzip, and falls back to gzip
+    # for clients that don't accept br
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
 
 # logging.basicConfig(level=logging.INFO, format='[FastAPI] %(asctime)s - %(levelname)s - %(message)s')
 
@@ -23,81 +44,134 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (/plants over a wide area runs to megabytes of JSON)
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_BYTES, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
 # Create the database tables
 models.Base.metadata.create_all(bind=database.engine)
 
 app.include_router(clicks.router)
+app.include_router(plant_layers.router)
+app.include_router(tiles.router)
 
-# Dependency to get a database session
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+@app.on_event("startup")
+async def load_plant_index():
+    # In "index" mode, build the in-memory plant index up front rather than on the first request.
+    # (Index builds run in a worker thread, so they never hold up the event loop.)
+    if PLANTS_BACKEND == "index":
+        try:
+            await asyncio.to_thread(plant_index.reload)
+        except Exception as e:
+            logging.error(f"Failed to load plant index: {e}")
+
+@app.on_event("startup")
+async def start_click_ingestion():
+    # Keep this month's (and the next few months') user_clicks partitions in place for as
+    # long as the server runs
+    app.state.click_partition_task = asyncio.create_task(run_partition_maintenance(database.async_engine))
+    if CLICK_BUFFER_ENABLED:
+        click_buffer.start()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    app.state.click_partition_task.cancel()
+    # Flush queued clicks before the engine goes away
+    if CLICK_BUFFER_ENABLED:
+        await click_buffer.stop()
+    await database.async_engine.dispose()
 
 @app.get("/health")
-def health_check(db: Session = Depends(get_db)):  # changed from plants.get_db
+async def health_check(db: AsyncSession = Depends(database.get_async_db)):  # changed from plants.get_db
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         return {"status": "success", "message": "Database connection successful"}
     except Exception as e:
         logging.error(f"Database connection failed: {e}")
         return {"status": "error", "message": f"Database connection failed: {e}"}
     
-@app.get("/plants", response_model=List[schemas.PlantDetail])
-def get_plants(southWestLat: float, southWestLng: float, northEastLat: float, northEastLng: float, db: Session = Depends(get_db)):
+async def query_plants(db, bbox, filters):
+    # Database backends: the plant_capacity summary, or the full Plant/Utility/Generator join
+    # (also used for status filters, which the summary can't answer)
+    if PLANTS_BACKEND == "summary" and filters.statuses is None:
+        return aggregate_capacity_rows((await db.execute(plant_capacity_query(bbox, filters))).all())
+    return aggregate_plant_rows((await db.execute(plant_rows_query(bbox, filters))).all())
+
+@app.get("/plants", response_model=List[schemas.PlantDetail], response_class=ORJSONResponse)
+async def get_plants(southWestLat: float, southWestLng: float, northEastLat: float, northEastLng: float,
+                     technology: Optional[List[str]] = Query(None),
+                     status: Optional[List[str]] = Query(None),
+                     min_capacity_mw: Optional[float] = Query(None, ge=0),
+                     format: str = Query("json", pattern="^(json|columnar|arrow|ndjson)$"),
+                     if_none_match: Optional[str] = Header(None),
+                     db: AsyncSession = Depends(database.get_async_db)):
+    bbox = BBox(southWestLat, southWestLng, northEastLat, northEastLng)
+    filters = PlantFilter.build(technology, status, min_capacity_mw)
     try:
-        # Join Plant, Utility, and left outer join Generator so that we can include generator data
-        q = db.query(
-            models.Plant,
-            models.Utility.utility_name,
-            models.Generator.generator_id, 
-            models.Generator.technology,
-            models.Generator.nameplate_capacity_mw
-        ).join(
-            models.Utility, models.Plant.utility_id == models.Utility.utility_id
-        ).outerjoin(
-            models.Generator, models.Plant.plant_code == models.Generator.plant_code
-        ).filter(
-            models.Plant.latitude >= southWestLat,
-            models.Plant.latitude <= northEastLat,
-            models.Plant.longitude >= southWestLng,
-            models.Plant.longitude <= northEastLng
-        )
-        results = q.all()
-        if not results:
+        data_version = await current_data_version(db)
+    except Exception as e:
+        logging.error(f"Error reading data version: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    # The response only depends on the loaded data, the bbox and the filters, so the same
+    # request at the same data version can be answered with 304 without querying anything.
+    etag = make_etag(PLANTS_BACKEND, data_version, format, filters, *(round(v, 6) for v in bbox))
+    cache_headers = {"ETag": etag, "Cache-Control": f"public, max-age={PLANTS_CACHE_MAX_AGE}"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    if format == "ndjson" and PLANTS_BACKEND != "index":
+        # Stream straight off the database cursor, skipping the cell cache. The first record
+        # is fetched up front so that, like every other format, an empty result is a 404.
+        try:
+            records = await prefetch_first(stream_plant_records(bbox, filters))
+        except Exception as e:
+            logging.error(f"Error querying plants: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+        if records is None:
             logging.warning("No plants found within the specified bounds.")
             raise HTTPException(status_code=404, detail="No plants found")
-        
-        plants_dict = {}
-
-        # First, accumulate capacities per plant and technology.
-        for plant, utility_name, generator_id, technology, capacity in results:
-            pcode = plant.plant_code
-            if pcode not in plants_dict:
-                plants_dict[pcode] = {
-                    "plant_code": plant.plant_code,
-                    "plant_name": plant.plant_name,
-                    "latitude": plant.latitude,
-                    "longitude": plant.longitude,
-                    "utility_name": utility_name,
-                    "tech_breakdown": {},  # will store summed capacities per technology
-                    "total_capacity_mw": 0.0,
-                }
-            if technology is not None:
-                # Initialize the technology sum if not present
-                if technology not in plants_dict[pcode]["tech_breakdown"]:
-                    plants_dict[pcode]["tech_breakdown"][technology] = 0.0
-                # Add the capacity for that technology
-                plants_dict[pcode]["tech_breakdown"][technology] += capacity or 0.0
-
-        # Then, compute total capacity per plant from the summed technology breakdown.
-        for pcode, plant_data in plants_dict.items():
-            plant_data["total_capacity_mw"] = sum(plant_data["tech_breakdown"].values())
-
-        # Return the list of aggregated plant records.
-        return list(plants_dict.values())
+        return StreamingResponse(ndjson_lines(records), media_type=NDJSON_MEDIA_TYPE, headers=cache_headers)
+
+    try:
+        if PLANTS_BACKEND == "index":
+            await refresh_plant_index(db)
+            plants = plant_index.query(bbox, filters)
+        elif plant_cell_cache.enabled:
+            plants = await plant_cell_cache.query(
+                bbox, data_version, lambda box: query_plants(db, box, filters), filters
+            )
+        else:
+            plants = await query_plants(db, bbox, filters)
     except Exception as e:
         logging.error(f"Error querying plants: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+    if not plants:
+        logging.warning("No plants found within the specified bounds.")
+        raise HTTPException(status_code=404, detail="No plants found")
+
+    if format == "ndjson":
+        return StreamingResponse(ndjson_lines(plants), media_type=NDJSON_MEDIA_TYPE, headers=cache_headers)
+    if format == "columnar":
+        return ORJSONResponse(plants_to_columns(plants), headers=cache_headers)
+    if format == "arrow":
+        return Response(plants_to_arrow(plants), media_type=ARROW_STREAM_MEDIA_TYPE, headers=cache_headers)
+    # Return the list of aggregated plant records. The records are built by our own
+    # aggregation code in PlantDetail's shape, so skip response_model re-validation and
+    # encode them straight to JSON with orjson.
+    return ORJSONResponse(plants, headers=cache_headers)
+
+@app.post("/plants/reload")
+async def reload_plants():
+    # Rebuild the in-memory plant index after the EIA-860 data has been reloaded.
+    # (Not normally needed: the index is rebuilt once requests see the loader's new data version.)
+    invalidate_data_version()
+    try:
+        count = await asyncio.to_thread(plant_index.reload)
+    except Exception as e:
+        logging.error(f"Error reloading plant index: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    return {"status": "success", "plants": count, "version": plant_index.version}
@@ -1,18 +1,40 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, PrimaryKeyConstraint, DateTime, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, BigInteger, Integer, String, Float, ForeignKey, PrimaryKeyConstraint, DateTime, func, Computed, Index
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.types import UserDefinedType
 from .database import Base
 
+class Point(UserDefinedType):
+    # Postgres native geometric point, stored as (x, y) = (longitude, latitude)
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "POINT"
+
 class UserClick(Base):
+    # Range-partitioned by month on click_time (see click_rollups.maintain_click_partitions)
     __tablename__ = 'user_clicks'
-    click_id = Column(Integer, primary_key=True, index=True)
-    click_time = Column(DateTime(timezone=True), server_default=func.now())
+    click_id = Column(Integer, primary_key=True, autoincrement=True)
+    click_time = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    __table_args__ = (
+        Index('ix_user_clicks_click_time_brin', 'click_time', postgresql_using='brin'),
+        {'postgresql_partition_by': 'RANGE (click_time)'},
+    )
+
+class UserClickRollup(Base):
+    # Click counts per grid cell (CLICK_ROLLUP_CELL_DEG degrees square) per hour
+    __tablename__ = 'user_click_rollups'
+    hour = Column(DateTime(timezone=True), primary_key=True)
+    cell_lat = Column(Integer, primary_key=True)
+    cell_lng = Column(Integer, primary_key=True)
+    click_count = Column(Integer, nullable=False)
 
 class Utility(Base):
     __tablename__ = "utilities"
     utility_id = Column(Integer, primary_key=True, index=True)
     utility_name = Column(String, index=True)
+    row_hash = deferred(Column(String))  # maintained by the EIA-860 loader for incremental loads
 
     plants = relationship("Plant", back_populates="utility")
 
@@ -23,8 +45,15 @@ class Plant(Base):
     latitude = Column(Float, index=True)
     longitude = Column(Float, index=True)
     utility_id = Column(Integer, ForeignKey("utilities.utility_id"))
+    # Derived from longitude/latitude by Postgres; GiST-indexed for bounding-box searches.
+    # Deferred so loading a Plant doesn't drag it along.
+    location = deferred(Column(Point, Computed("point(longitude, latitude)", persisted=True)))
+    row_hash = deferred(Column(String))  # maintained by the EIA-860 loader for incremental loads
 
     utility = relationship("Utility", back_populates="plants")
+    __table_args__ = (
+        Index('ix_plants_location', 'location', postgresql_using='gist'),
+    )
 
 class Generator(Base):
     __tablename__ = "generators"
@@ -33,7 +62,31 @@ class Generator(Base):
     technology = Column(String)
     nameplate_capacity_mw = Column(Float)
     status = Column(String)
+    row_hash = deferred(Column(String))  # maintained by the EIA-860 loader for incremental loads
     plant = relationship("Plant")
     __table_args__ = (
         PrimaryKeyConstraint('plant_code', 'generator_id'),
+        # /plants technology/status filters; covering, so the capacity subquery needs no heap reads
+        Index('ix_generators_technology_status', 'technology', 'status', 'plant_code',
+              postgresql_include=['nameplate_capacity_mw']),
+    )
+
+class PlantCapacity(Base):
+    # Per-plant, per-technology capacity summary, rebuilt by scripts/load_eia860_data.py
+    __tablename__ = "plant_capacity"
+    plant_code = Column(Integer, ForeignKey("plants.plant_code"), primary_key=True)
+    technology = Column(String, primary_key=True)
+    nameplate_capacity_mw = Column(Float)
+    generator_count = Column(Integer)
+    __table_args__ = (
+        PrimaryKeyConstraint('plant_code', 'technology'),
+        Index('ix_plant_capacity_technology', 'technology', 'plant_code',
+              postgresql_include=['nameplate_capacity_mw']),
     )
+
+class DataVersion(Base):
+    # Change counter per data set, bumped by the loader; see data_version.py
+    __tablename__ = "data_version"
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,97 @@
+import struct
+
+# Minimal Mapbox Vector Tile (v2) encoder for point layers.
+# Hand-rolled protobuf so the tile endpoint doesn't need a protobuf/MVT dependency;
+# see https://github.com/mapbox/vector-tile-spec/tree/master/2.1 for the format.
+
+MVT_EXTENT = 4096
+
+_VARINT = 0
+_FIXED64 = 1
+_LENGTH = 2
+
+_POINT = 1
+_MOVE_TO_ONE = (1 & 0x7) | (1 << 3)  # MoveTo command, count 1
+
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field, wire_type):
+    return _varint((field << 3) | wire_type)
+
+
+def _length_delimited(field, payload):
+    return _key(field, _LENGTH) + _varint(len(payload)) + payload
+
+
+def _packed(field, values):
+    return _length_delimited(field, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(value):
+    if isinstance(value, bool):
+        return _key(7, _VARINT) + _varint(int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _key(5, _VARINT) + _varint(value)
+        return _key(6, _VARINT) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _key(3, _FIXED64) + struct.pack("<d", value)
+    return _length_delimited(1, str(value).encode("utf-8"))
+
+
+def encode_point_layer(name, features, extent=MVT_EXTENT):
+    """
+    Encode a single point layer as a complete vector tile.
+
+    Parameters:
+        name (str): Layer name.
+        features (iterable): (feature_id, x, y, properties) tuples, with x/y already in
+            tile coordinates (0..extent) and properties a flat dict of scalar values.
+        extent (int): Tile extent in tile coordinate units.
+
+    Returns:
+        bytes: Protobuf-encoded tile.
+    """
+    keys, values = {}, {}
+    encoded_features = []
+    for feature_id, x, y, properties in features:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value), value), len(values)))
+        feature = (
+            _key(1, _VARINT) + _varint(feature_id) +
+            _packed(2, tags) +
+            _key(3, _VARINT) + _varint(_POINT) +
+            _packed(4, [_MOVE_TO_ONE, _zigzag(x), _zigzag(y)])
+        )
+        encoded_features.append(_length_delimited(2, feature))
+
+    layer = bytearray()
+    layer += _key(15, _VARINT) + _varint(2)
+    layer += _length_delimited(1, name.encode("utf-8"))
+    for feature in encoded_features:
+        layer += feature
+    for key in keys:
+        layer += _length_delimited(3, key.encode("utf-8"))
+    for _, value in values:
+        layer += _length_delimited(4, _encode_value(value))
+    layer += _key(5, _VARINT) + _varint(extent)
+    return _length_delimited(3, bytes(layer))
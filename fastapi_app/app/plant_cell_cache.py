@@ -0,0 +1,143 @@
+import math
+import threading
+from collections import OrderedDict
+
+from .config import PLANT_CELL_CACHE_ENTRIES, PLANT_CELL_CACHE_MB
+from .plant_queries import BBox, NO_FILTER
+
+# Grid-cell cache for /plants on the database backends.
+# Map bounds are arbitrary floats, so caching whole responses rarely hits. Instead each
+# request's bbox is snapped outward to a grid whose cell size follows the bbox size
+# (a rough stand-in for zoom), plants are cached per cell, and responses are put
+# together from cells and trimmed to the exact bbox. Panning around mostly re-reads
+# cells the last request already fetched; only the missing ones go to Postgres.
+
+MIN_CELL_DEG = 1 / 64
+MAX_CELL_DEG = 16.0
+CELLS_PER_SPAN = 4  # aim for about this many cells across the longer side of a bbox
+
+# Rough per-entry footprint used for the memory limit; dict-of-dicts records are costly
+_CELL_BYTES = 200
+_RECORD_BYTES = 800
+_TECH_BYTES = 150
+
+
+def cell_size(bbox):
+    """Power-of-two cell size, in degrees, for a bbox, so nearby zoom levels share cells."""
+    span = max(bbox.north - bbox.south, bbox.east - bbox.west, MIN_CELL_DEG)
+    size = 2.0 ** math.ceil(math.log2(span / CELLS_PER_SPAN))
+    return min(max(size, MIN_CELL_DEG), MAX_CELL_DEG)
+
+
+def _record_bytes(record):
+    return _RECORD_BYTES + _TECH_BYTES * len(record["tech_breakdown"])
+
+
+class PlantCellCache:
+    def __init__(self, max_entries=PLANT_CELL_CACHE_ENTRIES, max_bytes=PLANT_CELL_CACHE_MB * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._cells = OrderedDict()  # (data_version, filters, size, i, j) -> (records, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def _lookup(self, keys):
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._cells.get(key)
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self._cells.move_to_end(key)
+                    self.hits += 1
+                    found[key] = entry[0]
+        return found
+
+    def _store(self, cells):
+        with self._lock:
+            for key, records in cells.items():
+                nbytes = _CELL_BYTES + sum(_record_bytes(r) for r in records)
+                old = self._cells.pop(key, None)
+                if old is not None:
+                    self._bytes -= old[1]
+                self._cells[key] = (records, nbytes)
+                self._bytes += nbytes
+            while self._cells and (len(self._cells) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, nbytes) = self._cells.popitem(last=False)
+                self._bytes -= nbytes
+                self.evictions += 1
+
+    async def query(self, bbox, data_version, fetch, filters=NO_FILTER):
+        """
+        Return the plants inside bbox, reading cached cells and fetching the rest.
+
+        Parameters:
+            bbox (BBox): Requested bounding box.
+            data_version (int): Current data version; cells from older versions are never used.
+            fetch (callable): async fetch(BBox) -> list of plant dicts inside that box,
+                already filtered with filters.
+            filters (PlantFilter): Filters fetch applies; part of the cache key.
+
+        Returns:
+            list: Plant dicts matching schemas.PlantDetail, trimmed to bbox.
+        """
+        size = cell_size(bbox)
+        min_i, min_j = math.floor(bbox.south / size), math.floor(bbox.west / size)
+        max_i, max_j = math.floor(bbox.north / size), math.floor(bbox.east / size)
+        keys = [
+            (data_version, filters, size, i, j)
+            for i in range(min_i, max_i + 1)
+            for j in range(min_j, max_j + 1)
+        ]
+        cells = self._lookup(keys)
+
+        missing = [key for key in keys if key not in cells]
+        if missing:
+            # One query for the box around all missing cells; cells it also covers
+            # that were cached already are just refreshed.
+            south = min(key[3] for key in missing) * size
+            north = (max(key[3] for key in missing) + 1) * size
+            west = min(key[4] for key in missing) * size
+            east = (max(key[4] for key in missing) + 1) * size
+            fetched = {key: [] for key in missing}
+            for record in await fetch(BBox(south, west, north, east)):
+                key = (
+                    data_version, filters, size,
+                    math.floor(record["latitude"] / size), math.floor(record["longitude"] / size)
+                )
+                if key in fetched:
+                    fetched[key].append(record)
+            self._store(fetched)
+            cells.update(fetched)
+
+        return [
+            record
+            for key in keys
+            for record in cells[key]
+            if bbox.contains(record["latitude"], record["longitude"])
+        ]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._cells),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+plant_cell_cache = PlantCellCache()
@@ -0,0 +1,158 @@
+import math
+import threading
+
+# Server-side, zoom-aware clustering of plants for /plants/clusters.
+# Plants are binned into a square grid in Web Mercator space at every zoom level,
+# so a cluster covers roughly the same number of screen pixels at any zoom.
+# Grid sizes double from one zoom to the next, so each coarser level is built by
+# merging 2x2 blocks of the level below instead of re-scanning all plants.
+
+CLUSTER_CELL_PX = 64           # cluster cell size in screen pixels (256px tiles => 4 cells per tile)
+MAX_CLUSTER_ZOOM = 15          # above this zoom every plant is its own cluster
+MAX_MERCATOR_LAT = 85.0511287798
+
+
+def mercator_xy(lat, lng):
+    """Project lat/lng to normalized Web Mercator (0..1, y grows southward)."""
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat))
+    s = math.sin(math.radians(lat))
+    x = (lng + 180.0) / 360.0
+    y = 0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)
+    return x, y
+
+
+def cells_per_axis(zoom):
+    return (256 // CLUSTER_CELL_PX) * 2 ** zoom
+
+
+class Cluster:
+    __slots__ = ("count", "total_capacity_mw", "sum_lat", "sum_lng", "tech_breakdown", "plant_code")
+
+    def __init__(self):
+        self.count = 0
+        self.total_capacity_mw = 0.0
+        self.sum_lat = 0.0
+        self.sum_lng = 0.0
+        self.tech_breakdown = {}
+        self.plant_code = None
+
+    def add_plant(self, plant):
+        self.count += 1
+        self.total_capacity_mw += plant["total_capacity_mw"]
+        self.sum_lat += plant["latitude"]
+        self.sum_lng += plant["longitude"]
+        for tech, capacity in plant["tech_breakdown"].items():
+            self.tech_breakdown[tech] = self.tech_breakdown.get(tech, 0.0) + capacity
+        self.plant_code = plant["plant_code"] if self.count == 1 else None
+
+    def merge(self, other):
+        self.count += other.count
+        self.total_capacity_mw += other.total_capacity_mw
+        self.sum_lat += other.sum_lat
+        self.sum_lng += other.sum_lng
+        for tech, capacity in other.tech_breakdown.items():
+            self.tech_breakdown[tech] = self.tech_breakdown.get(tech, 0.0) + capacity
+        self.plant_code = other.plant_code if self.count == 1 else None
+
+    def to_dict(self):
+        return {
+            "latitude": self.sum_lat / self.count,
+            "longitude": self.sum_lng / self.count,
+            "count": self.count,
+            "total_capacity_mw": self.total_capacity_mw,
+            "tech_breakdown": self.tech_breakdown,
+            "plant_code": self.plant_code,
+        }
+
+
+class ClusterHierarchy:
+    def __init__(self, records):
+        """
+        Precompute clusters for zoom levels 0..MAX_CLUSTER_ZOOM.
+
+        Parameters:
+            records (list): Plant dicts as held by the plant index.
+        """
+        finest = {}
+        n = cells_per_axis(MAX_CLUSTER_ZOOM)
+        for plant in records:
+            if plant["latitude"] is None or plant["longitude"] is None:
+                continue
+            x, y = mercator_xy(plant["latitude"], plant["longitude"])
+            cell = (min(int(x * n), n - 1), min(int(y * n), n - 1))
+            cluster = finest.get(cell)
+            if cluster is None:
+                cluster = finest[cell] = Cluster()
+            cluster.add_plant(plant)
+
+        self.levels = [None] * (MAX_CLUSTER_ZOOM + 1)
+        self.levels[MAX_CLUSTER_ZOOM] = finest
+        for zoom in range(MAX_CLUSTER_ZOOM - 1, -1, -1):
+            level = {}
+            for (cx, cy), child in self.levels[zoom + 1].items():
+                parent = level.get((cx >> 1, cy >> 1))
+                if parent is None:
+                    parent = level[(cx >> 1, cy >> 1)] = Cluster()
+                parent.merge(child)
+            self.levels[zoom] = level
+
+    def query(self, bbox, zoom):
+        """
+        Return the clusters whose grid cell intersects a bounding box.
+
+        Parameters:
+            bbox (BBox): Bounding box to search.
+            zoom (int): Map zoom level, 0..MAX_CLUSTER_ZOOM.
+
+        Returns:
+            list: Cluster dicts matching schemas.PlantCluster.
+        """
+        level = self.levels[zoom]
+        n = cells_per_axis(zoom)
+        west, north = mercator_xy(bbox.north, bbox.west)
+        east, south = mercator_xy(bbox.south, bbox.east)
+        x0, x1 = max(int(west * n), 0), min(int(east * n), n - 1)
+        y0, y1 = max(int(north * n), 0), min(int(south * n), n - 1)
+
+        if (x1 - x0 + 1) * (y1 - y0 + 1) <= len(level):
+            clusters = (
+                level.get((x, y))
+                for x in range(x0, x1 + 1)
+                for y in range(y0, y1 + 1)
+            )
+        else:
+            clusters = (
+                cluster for (x, y), cluster in level.items()
+                if x0 <= x <= x1 and y0 <= y <= y1
+            )
+        return [cluster.to_dict() for cluster in clusters if cluster is not None]
+
+
+_hierarchy = None
+_hierarchy_version = None
+_hierarchy_lock = threading.Lock()
+
+
+def get_cluster_hierarchy(index):
+    """Return the cluster hierarchy for the plant index, rebuilding it if the index was reloaded."""
+    global _hierarchy, _hierarchy_version
+    with _hierarchy_lock:
+        if _hierarchy_version != index.version:
+            _hierarchy = ClusterHierarchy(index.records)
+            _hierarchy_version = index.version
+        return _hierarchy
+
+
+def plants_as_clusters(plants):
+    """Wrap individual plants as single-plant clusters, for zooms past MAX_CLUSTER_ZOOM."""
+    return [
+        {
+            "latitude": plant["latitude"],
+            "longitude": plant["longitude"],
+            "count": 1,
+            "total_capacity_mw": plant["total_capacity_mw"],
+            "tech_breakdown": plant["tech_breakdown"],
+            "plant_code": plant["plant_code"],
+        }
+        for plant in plants
+    ]
@@ -0,0 +1,73 @@
+import pyarrow as pa
+
+# Alternative encodings of /plants results (lists of schemas.PlantDetail-shaped dicts).
+#   "columnar" - JSON object of parallel arrays; each plant's technology breakdown is stored
+#                CSR-style (offsets into flat id/capacity arrays) with technology names
+#                dictionary-encoded, so no key names are repeated per plant
+#   "arrow"    - the same data as an Arrow IPC stream
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def plants_to_columns(plants):
+    """
+    Convert plant records to parallel arrays.
+
+    Plant k's technologies are tech_ids[tech_offsets[k]:tech_offsets[k + 1]] (indexes
+    into technologies), with matching capacities in tech_capacity_mw.
+
+    Parameters:
+        plants (list): Plant dicts matching schemas.PlantDetail.
+
+    Returns:
+        dict: Column name -> list, plus the technologies dictionary.
+    """
+    technologies = {}
+    columns = {
+        "plant_code": [], "plant_name": [], "latitude": [], "longitude": [],
+        "utility_name": [], "total_capacity_mw": [],
+        "technologies": None, "tech_offsets": [0], "tech_ids": [], "tech_capacity_mw": [],
+    }
+    for plant in plants:
+        for key in ("plant_code", "plant_name", "latitude", "longitude", "utility_name", "total_capacity_mw"):
+            columns[key].append(plant[key])
+        for technology, capacity in plant["tech_breakdown"].items():
+            columns["tech_ids"].append(technologies.setdefault(technology, len(technologies)))
+            columns["tech_capacity_mw"].append(capacity)
+        columns["tech_offsets"].append(len(columns["tech_ids"]))
+    columns["technologies"] = list(technologies)
+    return columns
+
+
+def plants_to_arrow(plants):
+    """
+    Encode plant records as an Arrow IPC stream with one row per plant.
+
+    tech_breakdown is a list<struct<technology: dictionary<int16, string>, capacity_mw: double>>.
+
+    Returns:
+        bytes: Arrow IPC stream.
+    """
+    columns = plants_to_columns(plants)
+    entries = pa.StructArray.from_arrays(
+        [
+            pa.DictionaryArray.from_arrays(
+                pa.array(columns["tech_ids"], pa.int16()), pa.array(columns["technologies"], pa.string())
+            ),
+            pa.array(columns["tech_capacity_mw"], pa.float64()),
+        ],
+        names=["technology", "capacity_mw"],
+    )
+    table = pa.table({
+        "plant_code": pa.array(columns["plant_code"], pa.int32()),
+        "plant_name": pa.array(columns["plant_name"], pa.string()),
+        "latitude": pa.array(columns["latitude"], pa.float64()),
+        "longitude": pa.array(columns["longitude"], pa.float64()),
+        "utility_name": pa.array(columns["utility_name"], pa.string()).dictionary_encode(),
+        "total_capacity_mw": pa.array(columns["total_capacity_mw"], pa.float64()),
+        "tech_breakdown": pa.ListArray.from_arrays(pa.array(columns["tech_offsets"], pa.int32()), entries),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
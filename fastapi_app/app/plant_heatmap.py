@@ -0,0 +1,106 @@
+import threading
+
+import numpy as np
+
+from .plant_clusters import MAX_MERCATOR_LAT
+
+# Capacity-weighted density grid for the map heatmap, computed with NumPy over
+# columnar copies of the in-memory plant index.
+
+HEATMAP_CELL_PX = 16        # grid cell size in screen pixels
+MAX_HEATMAP_BINS = 512      # per axis, caps the cost of very wide viewports
+
+
+class PlantArrays:
+    def __init__(self, records):
+        """
+        Columnar view of the plant index: coordinates plus a plant x technology capacity matrix.
+
+        Parameters:
+            records (list): Plant dicts as held by the plant index.
+        """
+        records = [r for r in records if r["latitude"] is not None and r["longitude"] is not None]
+        self.technologies = sorted({tech for r in records for tech in r["tech_breakdown"]})
+        tech_col = {tech: i for i, tech in enumerate(self.technologies)}
+
+        self.lat = np.fromiter((r["latitude"] for r in records), dtype=np.float64, count=len(records))
+        self.lng = np.fromiter((r["longitude"] for r in records), dtype=np.float64, count=len(records))
+        self.total = np.fromiter((r["total_capacity_mw"] for r in records), dtype=np.float64, count=len(records))
+        self.capacity = np.zeros((len(records), len(self.technologies)), dtype=np.float64)
+        for row, r in enumerate(records):
+            for tech, capacity in r["tech_breakdown"].items():
+                self.capacity[row, tech_col[tech]] = capacity
+
+        # Normalized Web Mercator coordinates, so grid cells are square on screen.
+        self.mx, self.my = mercator_arrays(self.lat, self.lng)
+
+    def weights(self, technologies=None):
+        if not technologies:
+            return self.total
+        wanted = set(technologies)
+        cols = [i for i, tech in enumerate(self.technologies) if tech in wanted]
+        return self.capacity[:, cols].sum(axis=1)
+
+
+def mercator_arrays(lat, lng):
+    s = np.sin(np.radians(np.clip(lat, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)))
+    return (lng + 180.0) / 360.0, 0.5 - np.log((1 + s) / (1 - s)) / (4 * np.pi)
+
+
+def capacity_grid(arrays, bbox, zoom, technologies=None):
+    """
+    Bin plant capacity inside a bounding box into a screen-aligned grid.
+
+    Parameters:
+        arrays (PlantArrays): Cached plant arrays.
+        bbox (BBox): Bounding box to grid.
+        zoom (int): Map zoom level; sets the cell size.
+        technologies (list): Optional technologies to weight by; default is total capacity.
+
+    Returns:
+        dict: {"cells": [[lat, lng, weight], ...], "max_weight": float} with each cell
+            placed at the capacity-weighted centroid of its plants.
+    """
+    (x0, x1), (y1, y0) = mercator_arrays(
+        np.array([bbox.south, bbox.north]), np.array([bbox.west, bbox.east])
+    )
+    world_px = 256 * 2 ** zoom
+    nx = int(min(max((x1 - x0) * world_px / HEATMAP_CELL_PX, 1), MAX_HEATMAP_BINS))
+    ny = int(min(max((y1 - y0) * world_px / HEATMAP_CELL_PX, 1), MAX_HEATMAP_BINS))
+
+    weights = arrays.weights(technologies)
+    mask = (
+        (arrays.lat >= bbox.south) & (arrays.lat <= bbox.north) &
+        (arrays.lng >= bbox.west) & (arrays.lng <= bbox.east) &
+        (weights > 0)
+    )
+    w = weights[mask]
+    if w.size == 0:
+        return {"cells": [], "max_weight": 0.0}
+
+    bins = [ny, nx]
+    extent = [[y0, y1], [x0, x1]]
+    my, mx = arrays.my[mask], arrays.mx[mask]
+    weight_sum, _, _ = np.histogram2d(my, mx, bins=bins, range=extent, weights=w)
+    lat_sum, _, _ = np.histogram2d(my, mx, bins=bins, range=extent, weights=w * arrays.lat[mask])
+    lng_sum, _, _ = np.histogram2d(my, mx, bins=bins, range=extent, weights=w * arrays.lng[mask])
+
+    occupied = weight_sum > 0
+    cell_weight = weight_sum[occupied]
+    cells = np.column_stack((lat_sum[occupied] / cell_weight, lng_sum[occupied] / cell_weight, cell_weight))
+    return {"cells": cells.tolist(), "max_weight": float(cell_weight.max())}
+
+
+_arrays = None
+_arrays_version = None
+_arrays_lock = threading.Lock()
+
+
+def get_plant_arrays(index):
+    """Return columnar plant arrays for the plant index, rebuilding them if the index was reloaded."""
+    global _arrays, _arrays_version
+    with _arrays_lock:
+        if _arrays_version != index.version:
+            _arrays = PlantArrays(index.records)
+            _arrays_version = index.version
+        return _arrays
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import math
+import threading
+
+from . import database
+from .config import PLANT_INDEX_CELL_DEG
+from .data_version import read_data_version, current_data_version, current_data_version_sync
+from .plant_queries import plant_rows_query, aggregate_plant_rows, generator_rows_query, NO_FILTER
+
+# In-memory spatial index of plants, used when PLANTS_BACKEND is "index".
+# The EIA-860 plant set is small (~15k plants) and only changes when the loader
+# runs, so we aggregate it once and answer bounding-box queries from a uniform
+# lat/lng grid instead of running the Plant/Utility/Generator join per request.
+
+
+class PlantIndex:
+    def __init__(self, cell_deg=PLANT_INDEX_CELL_DEG):
+        self.cell_deg = cell_deg
+        # (records, cells, generators), published as one tuple so a reader never pairs one
+        # load's cells with another load's generators
+        self._snapshot = ([], {}, {})
+        self.version = 0  # bumped on every (re)load so dependent caches can tell
+        self.data_version = None  # loader's data version the index was built from
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()  # one rebuild at a time
+
+    @property
+    def records(self):
+        return self._snapshot[0]
+
+    @property
+    def generators(self):
+        # plant_code -> [(technology, status, capacity)], for filtered queries
+        return self._snapshot[2]
+
+    @property
+    def loaded(self):
+        return self.version > 0
+
+    def _cell(self, lat, lng):
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    def load(self, db):
+        """
+        (Re)build the index from the database.
+
+        Parameters:
+            db (Session): Synchronous SQLAlchemy session.
+
+        Returns:
+            int: Number of plants indexed.
+        """
+        data_version = read_data_version(db)
+        records = aggregate_plant_rows(db.execute(plant_rows_query()).all())
+        generators = {}
+        for plant_code, technology, status, capacity in db.execute(generator_rows_query()):
+            generators.setdefault(plant_code, []).append((technology, status, capacity))
+        cells = {}
+        for record in records:
+            if record["latitude"] is None or record["longitude"] is None:
+                continue
+            cells.setdefault(self._cell(record["latitude"], record["longitude"]), []).append(record)
+
+        # Swap in the new data in one go so concurrent readers never see a half-built index.
+        with self._lock:
+            self._snapshot = (records, cells, generators)
+            self.data_version = data_version
+            self.version += 1
+        logging.info(f"Plant index loaded: {len(records)} plants in {len(cells)} cells.")
+        return len(records)
+
+    def reload(self):
+        """Rebuild the index with a session of its own. Blocking: async callers run it in a thread."""
+        with self._reload_lock, database.SessionLocal() as db:
+            return self.load(db)
+
+    def is_stale(self, data_version):
+        return not self.loaded or self.data_version != data_version
+
+    def ensure_current(self, db, data_version=None):
+        """
+        Rebuild the index if it hasn't been built yet or predates the current data version.
+
+        Parameters:
+            db (Session): Synchronous session, used to read the data version and to rebuild.
+            data_version (int): Data version to compare with; read from db when None.
+        """
+        if data_version is None:
+            data_version = current_data_version_sync(db)
+        if self.is_stale(data_version):
+            with self._reload_lock:
+                # Another request may have rebuilt it while we waited
+                if self.is_stale(data_version):
+                    self.load(db)
+
+    def _filtered(self, record, generators, filters):
+        # Rebuild the breakdown from the plant's matching generators; None if nothing is left
+        breakdown = {}
+        for technology, status, capacity in generators.get(record["plant_code"], ()):
+            if technology is not None and filters.matches(technology, status):
+                breakdown[technology] = breakdown.get(technology, 0.0) + (capacity or 0.0)
+        if not breakdown:
+            return None
+        total = sum(breakdown.values())
+        if filters.min_capacity_mw is not None and total < filters.min_capacity_mw:
+            return None
+        return dict(record, tech_breakdown=breakdown, total_capacity_mw=total)
+
+    def query(self, bbox, filters=NO_FILTER):
+        """
+        Return the plant records inside a bounding box.
+
+        Parameters:
+            bbox (BBox): Bounding box to search.
+            filters (PlantFilter): Optional generator filters.
+
+        Returns:
+            list: Plant dicts matching schemas.PlantDetail.
+        """
+        _, cells, generators = self._snapshot  # one read: a concurrent reload can't mix versions
+        min_i, min_j = self._cell(bbox.south, bbox.west)
+        max_i, max_j = self._cell(bbox.north, bbox.east)
+
+        results = []
+        # Walk whichever is smaller: the cells covered by the bbox, or the occupied cells.
+        if (max_i - min_i + 1) * (max_j - min_j + 1) <= len(cells):
+            candidates = (
+                cells.get((i, j), ())
+                for i in range(min_i, max_i + 1)
+                for j in range(min_j, max_j + 1)
+            )
+        else:
+            candidates = (
+                records for (i, j), records in cells.items()
+                if min_i <= i <= max_i and min_j <= j <= max_j
+            )
+        for records in candidates:
+            for record in records:
+                if not bbox.contains(record["latitude"], record["longitude"]):
+                    continue
+                if filters.active:
+                    record = self._filtered(record, generators, filters)
+                    if record is None:
+                        continue
+                results.append(record)
+        return results
+
+
+plant_index = PlantIndex()
+
+
+async def refresh_plant_index(db):
+    """
+    Rebuild the shared plant index if the loader has changed the data since it was built.
+
+    The rebuild scans every plant, so it runs in a worker thread with its own synchronous
+    session rather than on the event loop, where it would stall every other request.
+
+    Parameters:
+        db (AsyncSession): Session used to read the data version.
+    """
+    data_version = await current_data_version(db)
+    if plant_index.is_stale(data_version):
+        await asyncio.to_thread(_ensure_current, data_version)
+
+
+def _ensure_current(data_version):
+    with database.SessionLocal() as db:
+        plant_index.ensure_current(db, data_version)
@@ -0,0 +1,265 @@
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy import select, func, and_
+
+from . import models
+from .config import PLANTS_BBOX_FILTER
+
+# Shared query and aggregation helpers for plant data.
+# Used by the /plants handler and by the in-memory plant index.
+
+
+class BBox(NamedTuple):
+    south: float
+    west: float
+    north: float
+    east: float
+
+    def contains(self, lat, lng):
+        return self.south <= lat <= self.north and self.west <= lng <= self.east
+
+
+class PlantFilter(NamedTuple):
+    # Generator-level filters for /plants. A plant is kept if any of its generators match,
+    # and its tech_breakdown/total_capacity_mw only count the matching generators.
+    technologies: Optional[Tuple[str, ...]] = None
+    statuses: Optional[Tuple[str, ...]] = None
+    min_capacity_mw: Optional[float] = None  # applies to the plant's (filtered) total
+
+    @classmethod
+    def build(cls, technologies=None, statuses=None, min_capacity_mw=None):
+        # Sorted tuples, so equal filters compare (and hash, as cache keys) equal
+        return cls(
+            tuple(sorted(set(technologies))) if technologies else None,
+            tuple(sorted(set(statuses))) if statuses else None,
+            min_capacity_mw,
+        )
+
+    @property
+    def active(self):
+        return self.technologies is not None or self.statuses is not None or self.min_capacity_mw is not None
+
+    def matches(self, technology, status):
+        return (
+            (self.technologies is None or technology in self.technologies) and
+            (self.statuses is None or status in self.statuses)
+        )
+
+
+NO_FILTER = PlantFilter()
+
+
+def bbox_filter(bbox):
+    """
+    SQL condition selecting plants inside a bounding box.
+
+    Parameters:
+        bbox (BBox): Bounding box to filter on.
+
+    Returns:
+        ColumnElement: condition usable in a where() clause.
+    """
+    if PLANTS_BBOX_FILTER == "range":
+        return and_(
+            models.Plant.latitude >= bbox.south,
+            models.Plant.latitude <= bbox.north,
+            models.Plant.longitude >= bbox.west,
+            models.Plant.longitude <= bbox.east
+        )
+    # A single GiST lookup on the location point, instead of scanning one B-tree
+    # range and heap-checking the other coordinate.
+    return models.Plant.location.op("<@")(
+        func.box(func.point(bbox.west, bbox.south), func.point(bbox.east, bbox.north))
+    )
+
+
+def _generator_conditions(filters):
+    conditions = []
+    if filters.technologies is not None:
+        conditions.append(models.Generator.technology.in_(filters.technologies))
+    if filters.statuses is not None:
+        conditions.append(models.Generator.status.in_(filters.statuses))
+    return conditions
+
+
+def plant_rows_query(bbox=None, filters=NO_FILTER):
+    """
+    Build the Plant ⋈ Utility ⟕ Generator select, one row per plant/generator.
+
+    Parameters:
+        bbox (BBox): Optional bounding box; when None, every plant is returned.
+        filters (PlantFilter): Optional generator filters; only matching generators are
+            joined, and plants without any are left out.
+
+    Returns:
+        Select: statement yielding (Plant, utility_name, generator_id, technology, capacity).
+    """
+    # Join Plant, Utility, and left outer join Generator so that we can include generator data
+    q = select(
+        models.Plant,
+        models.Utility.utility_name,
+        models.Generator.generator_id,
+        models.Generator.technology,
+        models.Generator.nameplate_capacity_mw
+    ).join(
+        models.Utility, models.Plant.utility_id == models.Utility.utility_id
+    )
+    if filters.active:
+        conditions = _generator_conditions(filters)
+        q = q.join(models.Generator, and_(models.Plant.plant_code == models.Generator.plant_code, *conditions))
+        if filters.min_capacity_mw is not None:
+            q = q.where(models.Plant.plant_code.in_(
+                select(models.Generator.plant_code)
+                .where(*conditions)
+                .group_by(models.Generator.plant_code)
+                .having(func.sum(func.coalesce(models.Generator.nameplate_capacity_mw, 0)) >= filters.min_capacity_mw)
+            ))
+    else:
+        q = q.outerjoin(
+            models.Generator, models.Plant.plant_code == models.Generator.plant_code
+        )
+    if bbox is not None:
+        q = q.where(bbox_filter(bbox))
+    return q
+
+
+def aggregate_plant_rows(rows):
+    """
+    Collapse plant/generator rows into one record per plant.
+
+    Parameters:
+        rows (iterable): Rows as produced by plant_rows_query().
+
+    Returns:
+        list: Plant dicts matching schemas.PlantDetail.
+    """
+    plants_dict = {}
+
+    # First, accumulate capacities per plant and technology.
+    for plant, utility_name, generator_id, technology, capacity in rows:
+        pcode = plant.plant_code
+        if pcode not in plants_dict:
+            plants_dict[pcode] = {
+                "plant_code": plant.plant_code,
+                "plant_name": plant.plant_name,
+                "latitude": plant.latitude,
+                "longitude": plant.longitude,
+                "utility_name": utility_name,
+                "tech_breakdown": {},  # will store summed capacities per technology
+                "total_capacity_mw": 0.0,
+            }
+        if technology is not None:
+            # Initialize the technology sum if not present
+            if technology not in plants_dict[pcode]["tech_breakdown"]:
+                plants_dict[pcode]["tech_breakdown"][technology] = 0.0
+            # Add the capacity for that technology
+            plants_dict[pcode]["tech_breakdown"][technology] += capacity or 0.0
+
+    # Then, compute total capacity per plant from the summed technology breakdown.
+    for pcode, plant_data in plants_dict.items():
+        plant_data["total_capacity_mw"] = sum(plant_data["tech_breakdown"].values())
+
+    return list(plants_dict.values())
+
+
+def generator_rows_query():
+    """Select (plant_code, technology, status, capacity) for every generator."""
+    return select(
+        models.Generator.plant_code,
+        models.Generator.technology,
+        models.Generator.status,
+        models.Generator.nameplate_capacity_mw
+    )
+
+
+def plant_capacity_query(bbox=None, filters=NO_FILTER):
+    """
+    Build a select over the pre-aggregated plant_capacity table, one row per plant/technology.
+
+    Parameters:
+        bbox (BBox): Optional bounding box; when None, every plant is returned.
+        filters (PlantFilter): Optional technology/capacity filters. plant_capacity has no
+            status column, so status filters need plant_rows_query().
+
+    Returns:
+        Select: statement yielding (plant_code, plant_name, latitude, longitude,
+            utility_name, technology, capacity).
+    """
+    if filters.statuses is not None:
+        raise ValueError("plant_capacity can't be filtered by generator status")
+    q = select(
+        models.Plant.plant_code,
+        models.Plant.plant_name,
+        models.Plant.latitude,
+        models.Plant.longitude,
+        models.Utility.utility_name,
+        models.PlantCapacity.technology,
+        models.PlantCapacity.nameplate_capacity_mw
+    ).join(
+        models.Utility, models.Plant.utility_id == models.Utility.utility_id
+    )
+    if filters.active:
+        conditions = []
+        if filters.technologies is not None:
+            conditions.append(models.PlantCapacity.technology.in_(filters.technologies))
+        q = q.join(models.PlantCapacity, and_(models.Plant.plant_code == models.PlantCapacity.plant_code, *conditions))
+        if filters.min_capacity_mw is not None:
+            q = q.where(models.Plant.plant_code.in_(
+                select(models.PlantCapacity.plant_code)
+                .where(*conditions)
+                .group_by(models.PlantCapacity.plant_code)
+                .having(func.sum(models.PlantCapacity.nameplate_capacity_mw) >= filters.min_capacity_mw)
+            ))
+    else:
+        q = q.outerjoin(
+            models.PlantCapacity, models.Plant.plant_code == models.PlantCapacity.plant_code
+        )
+    if bbox is not None:
+        q = q.where(bbox_filter(bbox))
+    return q
+
+
+def aggregate_capacity_rows(rows):
+    """
+    Collapse plant_capacity rows into one record per plant.
+
+    Parameters:
+        rows (iterable): Rows as produced by plant_capacity_query().
+
+    Returns:
+        list: Plant dicts matching schemas.PlantDetail.
+    """
+    plants_dict = {}
+    for plant_code, plant_name, latitude, longitude, utility_name, technology, capacity in rows:
+        plant = plants_dict.get(plant_code)
+        if plant is None:
+            plant = plants_dict[plant_code] = {
+                "plant_code": plant_code,
+                "plant_name": plant_name,
+                "latitude": latitude,
+                "longitude": longitude,
+                "utility_name": utility_name,
+                "tech_breakdown": {},
+                "total_capacity_mw": 0.0,
+            }
+        if technology is not None:
+            # Rows are already summed per technology, so no per-generator work is left to do.
+            plant["tech_breakdown"][technology] = capacity or 0.0
+            plant["total_capacity_mw"] += capacity or 0.0
+    return list(plants_dict.values())
+
+
+def parse_bbox(bbox):
+    """
+    Parse a "west,south,east,north" query string value into a BBox.
+
+    Raises:
+        ValueError: if the string doesn't hold four numbers with south <= north.
+    """
+    parts = bbox.split(",")
+    if len(parts) != 4:
+        raise ValueError("bbox must be west,south,east,north")
+    west, south, east, north = (float(p) for p in parts)
+    if south > north:
+        raise ValueError("bbox south must not exceed north")
+    return BBox(south, west, north, east)
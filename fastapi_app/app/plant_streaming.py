@@ -0,0 +1,87 @@
+import orjson
+
+from . import database, models
+from .config import PLANTS_BACKEND
+from .plant_queries import NO_FILTER, plant_rows_query, aggregate_plant_rows, plant_capacity_query, aggregate_capacity_rows
+
+# Streaming /plants (format=ndjson): rows come off a server-side cursor ordered by
+# plant_code, so all of a plant's generator rows arrive together and each plant can be
+# aggregated and sent as soon as the next plant's first row shows up. Memory use stays
+# at one cursor batch plus one plant, however big the bbox. The first record is fetched
+# before the response starts (prefetch_first), so an empty result is a 404 as with
+# every other format, rather than a 200 with an empty body.
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_ROWS = 1000
+
+
+async def _grouped_records(rows, plant_code, aggregate):
+    group, current = [], None
+    async for row in rows:
+        code = plant_code(row)
+        if group and code != current:
+            yield aggregate(group)[0]
+            group = []
+        current = code
+        group.append(row)
+    if group:
+        yield aggregate(group)[0]
+
+
+async def stream_plant_records(bbox, filters=NO_FILTER):
+    """
+    Yield plant records inside a bbox, one at a time, in plant_code order.
+
+    Opens its own session: a StreamingResponse body runs after the request's
+    dependencies (and their sessions) have been closed.
+
+    Parameters:
+        bbox (BBox): Bounding box to search.
+        filters (PlantFilter): Optional generator filters.
+
+    Yields:
+        dict: Plant records matching schemas.PlantDetail.
+    """
+    if PLANTS_BACKEND == "summary" and filters.statuses is None:
+        query = plant_capacity_query(bbox, filters)
+        plant_code, aggregate = (lambda row: row[0]), aggregate_capacity_rows
+    else:
+        query = plant_rows_query(bbox, filters)
+        plant_code, aggregate = (lambda row: row[0].plant_code), aggregate_plant_rows
+    query = query.order_by(models.Plant.plant_code).execution_options(yield_per=STREAM_BATCH_ROWS)
+
+    async with database.AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for record in _grouped_records(result, plant_code, aggregate):
+            yield record
+
+
+async def prefetch_first(records):
+    """
+    Fetch the first record of an async iterator before any response is sent.
+
+    Returns:
+        AsyncIterator or None: Iterator over all the records, the first included; None
+            (with the iterator closed) if there are none.
+    """
+    first = await anext(records, None)
+    if first is None:
+        await records.aclose()
+        return None
+
+    async def all_records():
+        yield first
+        async for record in records:
+            yield record
+
+    return all_records()
+
+
+async def ndjson_lines(records):
+    """Encode an (async or plain) iterable of records as newline-delimited JSON."""
+    if hasattr(records, "__aiter__"):
+        async for record in records:
+            yield orjson.dumps(record) + b"\n"
+    else:
+        for record in records:
+            yield orjson.dumps(record) + b"\n"
@@ -0,0 +1,90 @@
+import json
+import math
+import threading
+from collections import OrderedDict
+
+from .config import TILE_CACHE_SIZE
+from .mvt import encode_point_layer, MVT_EXTENT
+from .plant_clusters import mercator_xy
+from .plant_queries import BBox
+
+# Vector tiles of plants, built from the in-memory plant index and kept in an LRU cache.
+# Tiles are keyed by the index version, so reloading the index retires every cached tile.
+
+TILE_BUFFER = 64  # tile units; plants this close to an edge go in both tiles so markers aren't clipped
+
+
+def tile_bbox(z, x, y, buffer=0):
+    """Lat/lng bounds of tile z/x/y, grown by `buffer` tile units on each side."""
+    n = 2 ** z
+    pad = buffer / MVT_EXTENT
+
+    def lng(tx):
+        return tx / n * 360.0 - 180.0
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return BBox(
+        south=lat(min(y + 1 + pad, n)),
+        west=lng(x - pad),
+        north=lat(max(y - pad, 0)),
+        east=lng(x + 1 + pad),
+    )
+
+
+def build_plant_tile(index, z, x, y):
+    """
+    Encode the plants in tile z/x/y as an MVT layer named "plants".
+
+    Parameters:
+        index (PlantIndex): Loaded plant index.
+        z, x, y (int): Tile address.
+
+    Returns:
+        bytes: Protobuf-encoded tile.
+    """
+    n = 2 ** z
+    features = []
+    for plant in index.query(tile_bbox(z, x, y, TILE_BUFFER)):
+        mx, my = mercator_xy(plant["latitude"], plant["longitude"])
+        features.append((
+            plant["plant_code"],
+            round((mx * n - x) * MVT_EXTENT),
+            round((my * n - y) * MVT_EXTENT),
+            {
+                "plant_code": plant["plant_code"],
+                "plant_name": plant["plant_name"],
+                "utility_name": plant["utility_name"],
+                "total_capacity_mw": float(plant["total_capacity_mw"]),
+                # MVT properties are flat, so the per-technology breakdown travels as JSON
+                "tech_breakdown": json.dumps(plant["tech_breakdown"], separators=(",", ":")),
+            },
+        ))
+    return encode_point_layer("plants", features)
+
+
+class TileCache:
+    def __init__(self, max_tiles=TILE_CACHE_SIZE):
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, index, z, x, y):
+        key = (index.version, z, x, y)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                return tile
+
+        tile = build_plant_tile(index, z, x, y)
+        with self._lock:
+            self._tiles[key] = tile
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return tile
+
+
+tile_cache = TileCache()
@@ -1,20 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from fastapi_app.app import models, schemas, database
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
-router = APIRouter(prefix="/clicks", tags=["clicks"])
+from fastapi import APIRouter, Body, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi_app.app import schemas, database
+from fastapi_app.app.click_buffer import click_buffer, write_clicks
+from fastapi_app.app.click_rollups import as_utc, hotspots_query, hotspot_rows_to_dicts
+from fastapi_app.app.config import (
+    CLICK_BUFFER_ENABLED, CLICK_BATCH_MAX_CLICKS, CLICK_TIME_MAX_AGE_S, CLICK_TIME_MAX_AHEAD_S
+)
+from fastapi_app.app.routers.params import bbox_param
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter(prefix="/clicks", tags=["clicks"])
 
 @router.post("/", response_model=schemas.UserClickCreate)
-def create_user_click(click: schemas.UserClickCreate, db: Session = Depends(get_db)):
-    db_click = models.UserClick(latitude=click.latitude, longitude=click.longitude)
-    db.add(db_click)
-    db.commit()
-    db.refresh(db_click)
-    return db_click
\ No newline at end of file
+async def create_user_click(click: schemas.UserClickCreate, db: AsyncSession = Depends(database.get_async_db)):
+    # Timestamp here rather than at insert time, so buffered clicks keep their real time
+    # and the rollup hour is known up front
+    row = {"latitude": click.latitude, "longitude": click.longitude, "click_time": datetime.now(timezone.utc)}
+    if CLICK_BUFFER_ENABLED:
+        await click_buffer.submit([row])
+    else:
+        await write_clicks(db, [row])
+    return row
+
+@router.post("/batch", response_model=schemas.ClickBatchResult)
+async def create_user_clicks(
+    clicks: List[schemas.UserClickCreate] = Body(..., max_length=CLICK_BATCH_MAX_CLICKS),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"latitude": click.latitude, "longitude": click.longitude,
+         "click_time": as_utc(click.click_time) if click.click_time else now}
+        for click in clicks
+    ]
+    if not rows:
+        raise HTTPException(status_code=400, detail="No clicks in batch")
+    # Only accept click times close to now: far past or future ones would pile up in
+    # user_clicks_default instead of a monthly partition
+    earliest = now - timedelta(seconds=CLICK_TIME_MAX_AGE_S)
+    latest = now + timedelta(seconds=CLICK_TIME_MAX_AHEAD_S)
+    outside = sum(1 for row in rows if not earliest <= row["click_time"] <= latest)
+    if outside:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{outside} click_time values outside the accepted window ({earliest.isoformat()} to {latest.isoformat()})",
+        )
+
+    if CLICK_BUFFER_ENABLED:
+        await click_buffer.submit(rows)
+    else:
+        await write_clicks(db, rows)
+    return {"accepted": len(rows)}
+
+@router.get("/hotspots", response_model=List[schemas.ClickHotspot])
+async def get_click_hotspots(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    by_hour: bool = False,
+    bbox=Depends(bbox_param),
+    db: AsyncSession = Depends(database.get_async_db),
+):
+    # Defaults to the last 24 hours
+    end = as_utc(end) if end else datetime.now(timezone.utc)
+    start = as_utc(start) if start else end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    rows = (await db.execute(hotspots_query(bbox, start, end, by_hour))).all()
+    return hotspot_rows_to_dicts(rows)
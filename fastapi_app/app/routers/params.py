@@ -0,0 +1,11 @@
+from fastapi import HTTPException, Query
+
+from fastapi_app.app.plant_queries import parse_bbox
+
+# Query parameter dependencies shared by the routers.
+
+def bbox_param(bbox: str = Query(..., description="west,south,east,north")):
+    try:
+        return parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import logging
+
+from fastapi_app.app import schemas, database
+from fastapi_app.app.plant_cell_cache import plant_cell_cache
+from fastapi_app.app.plant_index import plant_index
+from fastapi_app.app.plant_clusters import get_cluster_hierarchy, plants_as_clusters, MAX_CLUSTER_ZOOM
+from fastapi_app.app.plant_heatmap import get_plant_arrays, capacity_grid
+from fastapi_app.app.routers.params import bbox_param
+
+# Pre-aggregated map layers built from the in-memory plant index.
+
+router = APIRouter(prefix="/plants", tags=["plants"])
+
+def get_db():
+    db = database.SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/clusters", response_model=List[schemas.PlantCluster])
+def get_plant_clusters(zoom: int = Query(..., ge=0, le=22), bbox=Depends(bbox_param), db: Session = Depends(get_db)):
+    try:
+        plant_index.ensure_current(db)
+        if zoom > MAX_CLUSTER_ZOOM:
+            return plants_as_clusters(plant_index.query(bbox))
+        return get_cluster_hierarchy(plant_index).query(bbox, zoom)
+    except Exception as e:
+        logging.error(f"Error clustering plants: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/heatmap", response_model=schemas.HeatmapGrid)
+def get_plant_heatmap(
+    zoom: int = Query(..., ge=0, le=22),
+    bbox=Depends(bbox_param),
+    technology: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db),
+):
+    try:
+        plant_index.ensure_current(db)
+        return capacity_grid(get_plant_arrays(plant_index), bbox, zoom, technology)
+    except Exception as e:
+        logging.error(f"Error building plant heatmap: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/cache-stats")
+def get_plant_cache_stats():
+    # Hit/miss counters and size of the /plants grid-cell cache
+    return plant_cell_cache.stats()
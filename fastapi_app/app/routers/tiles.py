@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.orm import Session
+from typing import Optional
+import logging
+
+from fastapi_app.app import database
+from fastapi_app.app.data_version import current_data_version_sync, make_etag, etag_matches
+from fastapi_app.app.plant_index import plant_index
+from fastapi_app.app.plant_tiles import tile_cache
+
+router = APIRouter(prefix="/tiles", tags=["tiles"])
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+def get_db():
+    db = database.SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/plants/{z}/{x}/{y}.mvt")
+def get_plant_tile(z: int, x: int, y: int, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    if not 0 <= z <= 22 or not 0 <= x < 2 ** z or not 0 <= y < 2 ** z:
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    try:
+        data_version = current_data_version_sync(db)
+    except Exception as e:
+        logging.error(f"Error reading data version: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    # Tile URLs don't change when the data does, so caches must revalidate every time; the
+    # ETag follows the data version, making an unchanged tile a cheap 304.
+    etag = make_etag("tile", data_version, z, x, y)
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers)
+    try:
+        plant_index.ensure_current(db, data_version)
+        tile = tile_cache.get_or_build(plant_index, z, x, y)
+    except Exception as e:
+        logging.error(f"Error building plant tile {z}/{x}/{y}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE, headers=cache_headers)
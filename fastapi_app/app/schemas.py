@@ -12,6 +12,15 @@ class UserClickCreate(BaseModel):
     class Config:
         orm_mode = True
 
+class ClickBatchResult(BaseModel):
+    accepted: int
+
+class ClickHotspot(BaseModel):
+    latitude: float  # centre of the grid cell
+    longitude: float
+    hour: Optional[datetime] = None  # set when grouping by hour
+    click_count: int
+
 class UtilityBase(BaseModel):
     utility_id: int
     utility_name: str
@@ -44,6 +53,18 @@ class PlantDetail(BaseModel):
     class Config:
         orm_mode = True
 
+class PlantCluster(BaseModel):
+    latitude: float  # centroid of the clustered plants
+    longitude: float
+    count: int
+    total_capacity_mw: float
+    tech_breakdown: Dict[str, float]
+    plant_code: Optional[int] = None  # set only for single-plant clusters
+
+class HeatmapGrid(BaseModel):
+    cells: List[List[float]]  # [latitude, longitude, capacity_mw] per non-empty cell
+    max_weight: float
+
 class GeneratorBase(BaseModel):
     plant_code: int
     generator_id: str
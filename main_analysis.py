@@ -9,15 +9,22 @@ from src.monthly_analysis import (
 
 )
 from src.yearly_trend import plot_trend
+from src.app.observation_store import import_cdo_csv, daily_table
 
 def main():
     # Input paths
     # input_path = "data/climate_data.csv"
     input_path = "data/3901092.csv" # data from ABQ airport
     
-    # Step 1: Preprocess the data
+    # The CSV is imported into the local observation store the first time it's seen
+    # (see src/app/observation_store.py); later runs read the store instead of re-parsing it.
+    # Stations fetched with src/app/bulk_download.py can be read the same way.
+    stations = import_cdo_csv(input_path)
+    observations = daily_table(stations, elements=["TMAX", "TMIN"])
+
+    # Step 1: Preprocess the data (the store holds metric values)
     
-    processed_data = process_climate_data(input_path)
+    processed_data = process_climate_data(observations, units="metric")
 
     # Step 2: Compute monthly averages
     monthly_averages = compute_monthly_averages(processed_data)
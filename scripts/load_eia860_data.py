@@ -1,5 +1,8 @@
-import psycopg2
+import argparse
 import csv
+import io
+import os
+import psycopg2
 # 
 # This file loads the EIA-860 data into a PostgreSQL database.
 # This is electric power plant data.
@@ -9,12 +12,19 @@ import csv
 #  * download the zip file and extract the contents to the eia860_data folder
 #  * The data files are in Excel format, so we need to convert them to CSV
 #  * Run the convert_eia860_files.py script to convert the Excel files to CSV
+#    (or with --format parquet to typed Parquet, then load with --format parquet)
 #  * Run the checknulls.py script to check for NULL, empty, or whitespace values in the CSV files
 #    * The "generator" file has a "NOTE" row at the very end, which should be removed
 #  * Create a new database in PostgreSQL called 'climatechroma'
 #  * Run this script to load the data into the database
 #  * Load order is utilities, plants, generators, to maintain foreign key constraints
+#  * Every load bumps data_version ('eia860'); the FastAPI service watches it to change its
+#    /plants ETags and to rebuild the in-memory plant index behind /plants, /plants/clusters,
+#    /plants/heatmap and /tiles, so no restart or reload call is needed
 # 
+def connect():
+    return psycopg2.connect(dbname='climatechroma', user='postgres', host='localhost')
+
 def create_tables(conn):
     with conn.cursor() as cur:
         cur.execute("""
@@ -33,6 +43,11 @@ def create_tables(conn):
             FOREIGN KEY (utility_id) REFERENCES utilities(utility_id)
         );
 
+        -- Point (longitude, latitude) kept in sync by Postgres, GiST-indexed for bbox queries
+        ALTER TABLE plants ADD COLUMN IF NOT EXISTS location POINT
+            GENERATED ALWAYS AS (point(longitude, latitude)) STORED;
+        CREATE INDEX IF NOT EXISTS ix_plants_location ON plants USING gist (location);
+
         CREATE TABLE IF NOT EXISTS generators (
             plant_code INTEGER,
             generator_id TEXT,
@@ -42,9 +57,56 @@ def create_tables(conn):
             PRIMARY KEY (plant_code, generator_id),
             FOREIGN KEY (plant_code) REFERENCES plants(plant_code)
         );
+        -- Technology/status filters on /plants
+        CREATE INDEX IF NOT EXISTS ix_generators_technology_status
+            ON generators (technology, status, plant_code) INCLUDE (nameplate_capacity_mw);
+
+        CREATE TABLE IF NOT EXISTS plant_capacity (
+            plant_code INTEGER,
+            technology TEXT,
+            nameplate_capacity_mw DOUBLE PRECISION,
+            generator_count INTEGER,
+            PRIMARY KEY (plant_code, technology),
+            FOREIGN KEY (plant_code) REFERENCES plants(plant_code)
+        );
+        CREATE INDEX IF NOT EXISTS ix_plant_capacity_technology
+            ON plant_capacity (technology, plant_code) INCLUDE (nameplate_capacity_mw);
+
+        CREATE TABLE IF NOT EXISTS data_version (
+            name TEXT PRIMARY KEY,
+            version BIGINT NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        );
+
+        -- Hash of each row's loaded values, so --incremental compares against stored hashes
+        ALTER TABLE utilities ADD COLUMN IF NOT EXISTS row_hash TEXT;
+        ALTER TABLE plants ADD COLUMN IF NOT EXISTS row_hash TEXT;
+        ALTER TABLE generators ADD COLUMN IF NOT EXISTS row_hash TEXT;
         """)
         conn.commit()
 
+def refresh_plant_capacity(conn):
+    """Rebuild the per-plant/per-technology capacity summary served by /plants and bump the data version."""
+    # Delete + insert in one transaction, so readers see either the old or the new summary.
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM plant_capacity;")
+        cur.execute("""
+        INSERT INTO plant_capacity (plant_code, technology, nameplate_capacity_mw, generator_count)
+        SELECT plant_code, technology, SUM(COALESCE(nameplate_capacity_mw, 0)), COUNT(*)
+        FROM generators
+        WHERE technology IS NOT NULL
+        GROUP BY plant_code, technology;
+        """)
+        print(f"Refreshed plant_capacity: {cur.rowcount} plant/technology rows")
+        # Same transaction as the summary, so the API never sees a new version with the old summary
+        cur.execute("""
+        INSERT INTO data_version (name, version, updated_at) VALUES ('eia860', 1, now())
+        ON CONFLICT (name) DO UPDATE SET version = data_version.version + 1, updated_at = now()
+        RETURNING version;
+        """)
+        print(f"Data version is now {cur.fetchone()[0]}")
+    conn.commit()
+
 def convert_boolean(value):
     """Convert 'Yes'/'No' to boolean, and handle case sensitivity."""
     if isinstance(value, str):
@@ -67,61 +129,141 @@ def convert_numeric(value, dtype):
         return None
 
 def convert_text(value):
-    """Convert empty strings to None for text fields."""
-    return None if value.strip() == '' else value
+    """Strip text fields and convert empty strings to None, as the Parquet conversion does."""
+    value = value.strip()
+    return None if value == '' else value
 
-def load_data(conn, file_path, table_name, column_names, converters=None):
+# Mapping of CSV column names → DB column names
+# kinda janky to put table-specific stuff here, but whatever
+# risk is that mapping are not consistent across tables
+CSV_TO_DB_MAPPING = {
+    # Utilities table
+    'Utility ID': 'utility_id',
+    'Utility Name': 'utility_name',
+
+    # Plants table
+    'Plant Code': 'plant_code',
+    'Utility ID': 'utility_id',
+    'Plant Name': 'plant_name',
+    'Latitude': 'latitude',
+    'Longitude': 'longitude',
+
+    # Generators table
+    'Plant Code': 'plant_code',
+    'Generator ID': 'generator_id',
+    'Technology': 'technology',
+    'Nameplate Capacity (MW)': 'nameplate_capacity_mw',
+    'Status': 'status'
+}
+
+# Primary key and foreign key columns per table, used by the bulk loader
+TABLE_KEYS = {
+    'utilities': ['utility_id'],
+    'plants': ['plant_code'],
+    'generators': ['plant_code', 'generator_id'],
+}
+TABLE_FOREIGN_KEYS = {
+    'plants': {'utility_id': ('utilities', 'utility_id')},
+    'generators': {'plant_code': ('plants', 'plant_code')},
+}
+
+# What to load, in foreign key order
+LOAD_SPECS = [
+    {
+        'file': 'eia860_data/extracted/1___Utility_Y2023.csv',
+        'table': 'utilities',
+        'columns': ['utility_id', 'utility_name'],
+        'converters': {},
+    },
+    {
+        'file': 'eia860_data/extracted/2___Plant_Y2023.csv',
+        'table': 'plants',
+        'columns': ['plant_code', 'utility_id', 'plant_name', 'latitude', 'longitude'],
+        'converters': {
+            'Latitude': lambda x: convert_numeric(x, float),
+            'Longitude': lambda x: convert_numeric(x, float)
+        },
+    },
+    {
+        'file': 'eia860_data/extracted/3_1_Generator_Y2023.csv',
+        'table': 'generators',
+        'columns': ['plant_code', 'generator_id', 'technology', 'nameplate_capacity_mw', 'status'],
+        'converters': {
+            'Nameplate Capacity (MW)': lambda x: convert_numeric(x, float)
+        },
+    },
+]
+
+def read_csv_rows(file_path, column_names, converters=None):
+    """
+    Read an EIA-860 CSV and convert each row to DB column order.
+
+    Yields:
+        tuple: (line_number, raw_row, values) where values is None if the row
+            doesn't have the same number of fields as the header.
+    """
     if converters is None:
         converters = {}
 
-    with conn.cursor() as cur, open(file_path, 'r', encoding='utf-8') as f:
+    with open(file_path, 'r', encoding='utf-8') as f:
         reader = csv.reader(f)
         next(reader)  # Skip the first header line (metadata)
         headers = next(reader)  # Read the actual column names
-        print(f"Loading data into {table_name}. CSV Columns: {headers}")
-
-        # Mapping of CSV column names → DB column names
-        # kinda janky to put table-specific stuff here, but whatever
-        # risk is that mapping are not consistent across tables
-        csv_to_db_mapping = {
-            # Utilities table
-            'Utility ID': 'utility_id',
-            'Utility Name': 'utility_name',
-
-            # Plants table
-            'Plant Code': 'plant_code',
-            'Utility ID': 'utility_id',
-            'Plant Name': 'plant_name',
-            'Latitude': 'latitude',
-            'Longitude': 'longitude',
-
-            # Generators table
-            'Plant Code': 'plant_code',
-            'Generator ID': 'generator_id',
-            'Technology': 'technology',
-            'Nameplate Capacity (MW)': 'nameplate_capacity_mw',
-            'Status': 'status'
-        }
 
         for row in reader:
-            # print(f"Original row: {row}")  # Debugging output
-            
+            if len(row) != len(headers):
+                yield reader.line_num, row, None
+                continue
+
             # Convert row into a dictionary with DB column names
             row_dict = {
-                csv_to_db_mapping.get(col, col): converters.get(col, convert_text)(val)
+                CSV_TO_DB_MAPPING.get(col, col): converters.get(col, convert_text)(val)
                 for col, val in zip(headers, row)
-                if col in csv_to_db_mapping  # Only keep mapped columns
+                if col in CSV_TO_DB_MAPPING  # Only keep mapped columns
             }
-            # print(f"Converted row dict: {row_dict}")  # Debugging output
-
             # Extract values in the correct order
-            row = [row_dict[col] for col in column_names]
-            # print(f"Filtered row: {row}")  # Debugging output
+            yield reader.line_num, row, [row_dict.get(col) for col in column_names]
 
-            placeholders = ', '.join(['%s'] * len(column_names))
-            query = f"INSERT INTO {table_name} ({', '.join(column_names)}) VALUES ({placeholders}) ON CONFLICT DO NOTHING;"
-            # print(f"Executing query: {query}")  # Debugging output
-            # print(f"With values: {row}")  # Debugging output
+def read_parquet_rows(file_path, column_names):
+    """
+    Read a typed EIA-860 Parquet file (see convert_eia860_files.py --format parquet).
+
+    Values are already typed, so no per-cell converters are needed.
+
+    Yields:
+        tuple: (line_number, raw_row, values), numbered as in the equivalent CSV.
+    """
+    import pyarrow.parquet as pq
+
+    db_to_source = {db: src for src, db in CSV_TO_DB_MAPPING.items()}
+    parquet = pq.ParquetFile(file_path)
+    available = set(parquet.schema_arrow.names)
+    source_columns = [db_to_source[col] for col in column_names if db_to_source[col] in available]
+
+    line_num = 2  # the CSV has a title line and a header line before the data
+    for batch in parquet.iter_batches(columns=source_columns, batch_size=10000):
+        data = batch.to_pydict()
+        for i in range(batch.num_rows):
+            line_num += 1
+            row = [data[db_to_source[col]][i] if db_to_source[col] in data else None for col in column_names]
+            yield line_num, row, row
+
+def read_rows(file_path, column_names, converters=None):
+    """Read converted rows from either an EIA-860 CSV or a typed Parquet file."""
+    if file_path.endswith('.parquet'):
+        return read_parquet_rows(file_path, column_names)
+    return read_csv_rows(file_path, column_names, converters)
+
+def load_data(conn, file_path, table_name, column_names, converters=None):
+    print(f"Loading data into {table_name} from {file_path}")
+    placeholders = ', '.join(['%s'] * len(column_names))
+    query = f"INSERT INTO {table_name} ({', '.join(column_names)}) VALUES ({placeholders}) ON CONFLICT DO NOTHING;"
+
+    with conn.cursor() as cur:
+        for line_num, raw_row, row in read_rows(file_path, column_names, converters):
+            if row is None:
+                print(f"Skipping malformed line {line_num}: {raw_row}")
+                continue
 
             print(f"Inserting into {table_name}: {row}")  # Debugging output
 
@@ -134,8 +276,238 @@ def load_data(conn, file_path, table_name, column_names, converters=None):
         
         conn.commit()
 
+class CopyStream:
+    """File-like object that feeds rows to COPY ... FROM STDIN as CSV, one row at a time."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator='\n')
+        self._pending = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+def write_rejects(reject_path, rejects):
+    """Append rejected rows to a CSV side file: line, reason, then the row's fields."""
+    if not rejects:
+        return
+    os.makedirs(os.path.dirname(reject_path) or '.', exist_ok=True)
+    with open(reject_path, 'a', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        for line_num, reason, row in rejects:
+            writer.writerow([line_num, reason] + list(row))
+    print(f"Wrote {len(rejects)} rejected rows to {reject_path}")
+
+def row_hash_sql(columns, alias=None):
+    """SQL expression hashing a row's values; the same expression fills and checks row_hash."""
+    prefix = f"{alias}." if alias else ''
+    return f"md5(ROW({', '.join(prefix + c for c in columns)})::text)"
+
+def stage_rows(conn, table_name, column_names, rows):
+    """
+    COPY rows into a temporary staging table shaped like table_name, with each row's row_hash filled in.
+
+    Returns:
+        str: Schema-qualified name of the staging table (dropped at commit).
+    """
+    # Always qualified with pg_temp, so the DROP can never hit a permanent table of the same name
+    staging = f"pg_temp.staging_{table_name}"
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {staging};")
+        cur.execute(f"""
+            CREATE TEMP TABLE {staging} (LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP;
+            ALTER TABLE {staging} ADD COLUMN source_line INTEGER;
+        """)
+        cur.copy_expert(
+            f"COPY {staging} ({', '.join(column_names)}, source_line) FROM STDIN WITH (FORMAT csv)",
+            CopyStream(rows)
+        )
+        cur.execute(f"UPDATE {staging} SET row_hash = {row_hash_sql(column_names)};")
+    return staging
+
+def stage_file(conn, file_path, table_name, column_names, converters, rejects):
+    """
+    Stage an EIA-860 CSV for merging, appending unloadable rows to rejects.
+
+    Returns:
+        str: Name of the staging table (dropped at commit).
+    """
+    keys = TABLE_KEYS[table_name]
+    key_positions = [column_names.index(k) for k in keys]
+
+    def good_rows():
+        for line_num, raw_row, row in read_rows(file_path, column_names, converters):
+            if row is None:
+                rejects.append((line_num, "wrong number of fields", raw_row))
+            elif any(row[i] is None for i in key_positions):
+                rejects.append((line_num, f"missing key {', '.join(keys)}", raw_row))
+            else:
+                yield row + [line_num]
+
+    return stage_rows(conn, table_name, column_names, good_rows())
+
+def reject_orphans(conn, staging, table_name, parents=None):
+    """
+    Remove staged rows whose foreign keys don't resolve, returning them as rejects.
+
+    parents optionally maps a referenced table to the table to check instead
+    (e.g. its staging table, when the staged data replaces it).
+    """
+    parents = parents or {}
+    rejects = []
+    with conn.cursor() as cur:
+        for column, (ref_table, ref_column) in TABLE_FOREIGN_KEYS.get(table_name, {}).items():
+            cur.execute(f"""
+                DELETE FROM {staging} s
+                WHERE s.{column} IS NOT NULL
+                  AND NOT EXISTS (SELECT 1 FROM {parents.get(ref_table, ref_table)} r WHERE r.{ref_column} = s.{column})
+                RETURNING s.*;
+            """)
+            names = [d.name for d in cur.description]
+            for record in cur.fetchall():
+                record = dict(zip(names, record))
+                line_num = record.pop('source_line')
+                rejects.append((line_num, f"no {ref_table} row with {ref_column}={record[column]}", record.values()))
+    return rejects
+
+def bulk_load_data(conn, file_path, table_name, column_names, converters=None, reject_path=None):
+    """
+    Load a CSV with COPY into a staging table, then merge it into the target table.
+
+    Rows that can't be loaded (malformed lines, missing key values, dangling foreign keys)
+    are written to reject_path instead of aborting the load. Commits once, at the end.
+    """
+    keys = TABLE_KEYS[table_name]
+    rejects = []
+    staging = stage_file(conn, file_path, table_name, column_names, converters, rejects)
+    rejects.extend(reject_orphans(conn, staging, table_name))
+
+    columns = ', '.join(column_names + ['row_hash'])
+    updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in column_names + ['row_hash'] if c not in keys)
+    with conn.cursor() as cur:
+        # DISTINCT ON keeps the last occurrence of a key repeated within the file
+        cur.execute(f"""
+            INSERT INTO {table_name} ({columns})
+            SELECT DISTINCT ON ({', '.join(keys)}) {columns}
+            FROM {staging}
+            ORDER BY {', '.join(keys)}, source_line DESC
+            ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates};
+        """)
+        merged = cur.rowcount
+    conn.commit()
+
+    print(f"Loaded {merged} rows into {table_name} from {file_path} ({len(rejects)} rejected)")
+    if reject_path:
+        write_rejects(reject_path, rejects)
+    return merged, len(rejects)
+
+def incremental_load(conn, specs, rejects_dir=None):
+    """
+    Bring the tables in line with a new set of EIA-860 files, touching only rows that changed.
+
+    Each staged CSV row is hashed once and compared with the row_hash stored with the row
+    of the same key: new keys are inserted, changed rows updated, and keys missing from the
+    new files deleted. Everything happens in one transaction, so readers never see a
+    half-applied release.
+
+    Returns:
+        dict: {table: {"inserted": n, "updated": n, "deleted": n, "rejected": n}}
+    """
+    staged, rejects = {}, {}
+    for spec in specs:
+        table = spec['table']
+        keys = ', '.join(TABLE_KEYS[table])
+        rejects[table] = []
+        staging = stage_file(conn, spec['file'], table, spec['columns'], spec['converters'], rejects[table])
+        with conn.cursor() as cur:
+            # Keep only the last occurrence of a key repeated within the file
+            cur.execute(f"""
+                DELETE FROM {staging} WHERE source_line NOT IN (
+                    SELECT DISTINCT ON ({keys}) source_line FROM {staging} ORDER BY {keys}, source_line DESC
+                );
+            """)
+        # Check foreign keys against the incoming parents rather than the live tables,
+        # so a parent that is about to be deleted can't satisfy them.
+        rejects[table].extend(reject_orphans(conn, staging, table, parents=staged))
+        staged[table] = staging
+
+    summary = {}
+    with conn.cursor() as cur:
+        # Inserts and updates go parent-first, deletes child-first, so foreign keys hold throughout
+        for spec in specs:
+            table, columns = spec['table'], spec['columns']
+            keys = TABLE_KEYS[table]
+            match = ' AND '.join(f"t.{k} = s.{k}" for k in keys)
+            # Rows loaded without --bulk/--incremental (or before row_hash existed) get their hash
+            # once here; after that this finds nothing to do
+            cur.execute(f"UPDATE {table} t SET row_hash = {row_hash_sql(columns, 't')} WHERE t.row_hash IS NULL;")
+            stored_columns = columns + ['row_hash']
+            cur.execute(f"""
+                INSERT INTO {table} ({', '.join(stored_columns)})
+                SELECT {', '.join(f's.{c}' for c in stored_columns)} FROM {staged[table]} s
+                WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE {match});
+            """)
+            inserted = cur.rowcount
+            cur.execute(f"""
+                UPDATE {table} t SET {', '.join(f'{c} = s.{c}' for c in stored_columns if c not in keys)}
+                FROM {staged[table]} s
+                WHERE {match} AND t.row_hash IS DISTINCT FROM s.row_hash;
+            """)
+            summary[table] = {"inserted": inserted, "updated": cur.rowcount, "rejected": len(rejects[table])}
+
+        if 'plants' in staged:
+            # plant_capacity references plants; drop summary rows of plants about to go away
+            cur.execute(f"""
+                DELETE FROM plant_capacity c
+                WHERE NOT EXISTS (SELECT 1 FROM {staged['plants']} s WHERE s.plant_code = c.plant_code);
+            """)
+        for spec in reversed(specs):
+            table = spec['table']
+            match = ' AND '.join(f"t.{k} = s.{k}" for k in TABLE_KEYS[table])
+            cur.execute(f"""
+                DELETE FROM {table} t
+                WHERE NOT EXISTS (SELECT 1 FROM {staged[table]} s WHERE {match});
+            """)
+            summary[table]["deleted"] = cur.rowcount
+    conn.commit()
+
+    for table, counts in summary.items():
+        print(f"{table}: {counts['inserted']} inserted, {counts['updated']} updated, "
+              f"{counts['deleted']} deleted, {counts['rejected']} rejected")
+        if rejects_dir:
+            write_rejects(os.path.join(rejects_dir, f"{table}_rejects.csv"), rejects[table])
+    return summary
+
 def main():
-    conn = psycopg2.connect(dbname='climatechroma', user='postgres', host='localhost')
+    parser = argparse.ArgumentParser(description="Load EIA-860 CSV files into PostgreSQL.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--bulk', action='store_true',
+                      help="Load with COPY + merge, one commit per table, instead of row-by-row INSERTs")
+    mode.add_argument('--incremental', action='store_true',
+                      help="Apply only the inserts, updates and deletes needed to match the files")
+    parser.add_argument('--rejects-dir', default='eia860_data/rejects',
+                        help="Where --bulk/--incremental write <table>_rejects.csv for rows they could not load")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help="Load the .csv files, or the typed .parquet files from convert_eia860_files.py")
+    args = parser.parse_args()
+
+    specs = LOAD_SPECS
+    if args.format == 'parquet':
+        specs = [dict(spec, file=spec['file'].replace('.csv', '.parquet')) for spec in LOAD_SPECS]
+
+    conn = connect()
     create_tables(conn)
     
     # Load data from CSV files into the database
@@ -144,25 +516,30 @@ def main():
     # 2. Load plants
     # 3. Load generators
     # Alternatively we could use DEFERRABLE INITIALLY DEFERRED constraints, but that's more complex.
-    
-    load_data(conn, 'eia860_data/extracted/1___Utility_Y2023.csv', 'utilities', [
-        'utility_id', 'utility_name'
-    ])
-    
-    load_data(conn, 'eia860_data/extracted/2___Plant_Y2023.csv', 'plants', [
-        'plant_code', 'utility_id', 'plant_name', 'latitude', 'longitude'
-    ], converters={
-        'Latitude': lambda x: convert_numeric(x, float),
-        'Longitude': lambda x: convert_numeric(x, float)
-    })
-
-    load_data(conn, 'eia860_data/extracted/3_1_Generator_Y2023.csv', 'generators', [
-        'plant_code', 'generator_id', 'technology', 'nameplate_capacity_mw','status'
-    ], converters={
-        'Nameplate Capacity (MW)': lambda x: convert_numeric(x, float)
-    })
+    if args.bulk or args.incremental:
+        for spec in specs:
+            reject_path = os.path.join(args.rejects_dir, f"{spec['table']}_rejects.csv")
+            if os.path.exists(reject_path):
+                os.remove(reject_path)
+
+    if args.incremental:
+        summary = incremental_load(conn, specs, args.rejects_dir)
+        if not any(counts[op] for counts in summary.values() for op in ('inserted', 'updated', 'deleted')):
+            # Nothing changed, so leave the summary table (and anything caching it) alone
+            print("No changes.")
+            conn.close()
+            return
+    else:
+        for spec in specs:
+            if args.bulk:
+                reject_path = os.path.join(args.rejects_dir, f"{spec['table']}_rejects.csv")
+                bulk_load_data(conn, spec['file'], spec['table'], spec['columns'], spec['converters'], reject_path)
+            else:
+                load_data(conn, spec['file'], spec['table'], spec['columns'], spec['converters'])
+
+    # Rebuild the capacity summary now that generators are loaded
+    refresh_plant_capacity(conn)
 
     conn.close()
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,243 @@
+import argparse
+import csv
+import fnmatch
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# The loader sits next to this script; make it importable however this script is started
+# (python scripts/load_eia860_years.py, or imported from the repo root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from load_eia860_data import (
+    LOAD_SPECS, CopyStream, connect, create_tables, bulk_load_data, convert_numeric, read_rows, refresh_plant_capacity
+)
+#
+# Multi-year EIA-860 ingestion.
+# Expects a directory with one extracted EIA-860 release per subdirectory, named with its year
+# (e.g. eia860_data/years/eia8602019/, eia860_data/years/2020/).
+#  * Each year's utility, plant and generator workbooks are converted to CSV in parallel,
+#    one process per workbook. Older releases name their files and columns differently
+#    (UtilityY09.xls, "PLNTCODE", ...), so headers are located and normalized to the
+#    2023 names that load_eia860_data.py understands.
+#  * The newest year is loaded into the serving tables (utilities, plants, generators).
+#  * Every year's generators go into generator_history, which is partitioned by report year;
+#    each year's partition is loaded by its own worker.
+# Releases before 2004 were published as DBF files and are skipped.
+#
+
+# Filename patterns (case-insensitive) per schedule; {yyyy} and {yy} are filled in with the year
+SCHEDULE_PATTERNS = {
+    'utility': ['*utility*y{yyyy}*.xls*', '*utility*y{yy}.xls*', '*util*{yyyy}*.xls*'],
+    'plant': ['*plant*y{yyyy}*.xls*', '*plant*y{yy}.xls*', '*plant*{yyyy}*.xls*'],
+    'generator': ['*generator*y{yyyy}*.xls*', '*generator*y{yy}.xls*', '*gen*y{yy}*.xls*', '*gen*{yyyy}*.xls*'],
+}
+SCHEDULE_TABLES = {'utility': 'utilities', 'plant': 'plants', 'generator': 'generators'}
+
+# Normalized header (lowercase, alphanumerics only) → header name used by the loader
+HEADER_ALIASES = {
+    'utilityid': 'Utility ID', 'utilitycode': 'Utility ID', 'utilcode': 'Utility ID',
+    'utilityname': 'Utility Name', 'utilname': 'Utility Name',
+    'plantcode': 'Plant Code', 'plntcode': 'Plant Code', 'plantid': 'Plant Code',
+    'plantname': 'Plant Name', 'plntname': 'Plant Name',
+    'latitude': 'Latitude', 'longitude': 'Longitude',
+    'generatorid': 'Generator ID', 'genid': 'Generator ID', 'gencode': 'Generator ID',
+    'technology': 'Technology',
+    'nameplatecapacitymw': 'Nameplate Capacity (MW)', 'nameplate': 'Nameplate Capacity (MW)',
+    'status': 'Status',
+}
+ID_HEADERS = {'Utility ID', 'Plant Code', 'Generator ID'}
+
+# A row is the header row if it names this schedule's key column
+SCHEDULE_KEY_HEADERS = {'utility': 'Utility ID', 'plant': 'Plant Code', 'generator': 'Generator ID'}
+
+
+def normalize_header(value):
+    key = re.sub(r'[^a-z0-9]', '', str(value).lower())
+    return HEADER_ALIASES.get(key, str(value).strip())
+
+
+def find_workbook(year_dir, schedule, year):
+    """Return the path of the schedule's workbook under year_dir, or None."""
+    patterns = [p.format(yyyy=year, yy=str(year)[-2:]) for p in SCHEDULE_PATTERNS[schedule]]
+    for pattern in patterns:
+        matches = []
+        for root, _, files in os.walk(year_dir):
+            for name in files:
+                if not name.startswith('~$') and fnmatch.fnmatch(name.lower(), pattern):
+                    matches.append(os.path.join(root, name))
+        if matches:
+            return sorted(matches)[0]
+    return None
+
+
+def discover_years(years_dir, wanted=None):
+    """Map year → {schedule: workbook path} for every year subdirectory of years_dir."""
+    found = {}
+    for entry in sorted(os.listdir(years_dir)):
+        match = re.search(r'(19|20)\d{2}', entry)
+        path = os.path.join(years_dir, entry)
+        if not match or not os.path.isdir(path):
+            continue
+        year = int(match.group(0))
+        if wanted and year not in wanted:
+            continue
+        workbooks = {schedule: find_workbook(path, schedule, year) for schedule in SCHEDULE_PATTERNS}
+        missing = [schedule for schedule, workbook in workbooks.items() if workbook is None]
+        if missing:
+            print(f"Skipping {year}: no workbook found for {', '.join(missing)}")
+            continue
+        found[year] = workbooks
+    return found
+
+
+def convert_workbook(task):
+    """
+    Convert the first sheet of one workbook to a loader-ready CSV. Runs in a worker process.
+
+    The CSV has the same two header lines as the 2023 files: a title line, then
+    the (normalized) column names.
+    """
+    year, schedule, workbook, csv_path = task
+    raw = pd.read_excel(workbook, sheet_name=0, header=None, dtype=str)
+
+    key_header = SCHEDULE_KEY_HEADERS[schedule]
+    header_row = next(
+        (i for i in range(min(len(raw), 10)) if key_header in {normalize_header(v) for v in raw.iloc[i]}),
+        None
+    )
+    if header_row is None:
+        raise ValueError(f"{workbook}: no header row with '{key_header}'")
+    headers = [normalize_header(v) for v in raw.iloc[header_row]]
+    data = raw.iloc[header_row + 1:].fillna('').copy()
+
+    # Older .xls releases store IDs as numbers, which come back as "123.0"
+    for col, header in enumerate(headers):
+        if header in ID_HEADERS:
+            data[data.columns[col]] = data[data.columns[col]].str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([f"{year} Form EIA-860 Data - {os.path.basename(workbook)}"])
+        writer.writerow(headers)
+        writer.writerows(data.itertuples(index=False, name=None))
+    return year, schedule, csv_path, len(data)
+
+
+def create_history_table(conn, years):
+    """Create generator_history, partitioned by report year, with a partition for each year."""
+    with conn.cursor() as cur:
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS generator_history (
+            report_year INTEGER NOT NULL,
+            plant_code INTEGER NOT NULL,
+            generator_id TEXT NOT NULL,
+            technology TEXT,
+            nameplate_capacity_mw REAL,
+            status TEXT,
+            PRIMARY KEY (report_year, plant_code, generator_id)
+        ) PARTITION BY LIST (report_year);
+        """)
+        for year in years:
+            cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS generator_history_y{year}
+                PARTITION OF generator_history FOR VALUES IN ({year});
+            """)
+    conn.commit()
+
+
+def load_generator_history(task):
+    """Replace one year's generator_history partition with that year's generators. Runs in a worker process."""
+    year, csv_path = task
+    spec = next(s for s in LOAD_SPECS if s['table'] == 'generators')
+    columns = spec['columns']
+
+    # Last occurrence of a (plant_code, generator_id) wins, as in the serving-table loads.
+    # Plant codes are checked here: one blank or non-numeric code would fail the whole COPY.
+    rows = {}
+    dropped = 0
+    for _, _, row in read_rows(csv_path, columns, spec['converters']):
+        if row is None:
+            dropped += 1
+            continue
+        plant_code = row[0] if isinstance(row[0], int) else convert_numeric(str(row[0] or ''), int)
+        if plant_code is None or row[1] is None:
+            dropped += 1
+            continue
+        rows[(plant_code, row[1])] = [year, plant_code] + row[1:]
+    if dropped:
+        print(f"{year}: dropped {dropped} generator rows without a numeric plant code or a generator ID")
+
+    conn = connect()
+    try:
+        with conn.cursor() as cur:
+            # Writing straight to the partition keeps each worker's locks to its own year
+            cur.execute(f"TRUNCATE generator_history_y{year};")
+            cur.copy_expert(
+                f"COPY generator_history_y{year} (report_year, {', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                CopyStream(rows.values())
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    return year, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert and load several years of EIA-860 data.")
+    parser.add_argument('years_dir', help="Directory with one extracted EIA-860 release per year subdirectory")
+    parser.add_argument('--out-dir', default='eia860_data/converted', help="Where converted CSVs are written")
+    parser.add_argument('--years', help="Year range to process, e.g. 2010-2023 (default: all found)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument('--rejects-dir', default='eia860_data/rejects',
+                        help="Where rows rejected from the serving tables are written")
+    args = parser.parse_args()
+
+    wanted = None
+    if args.years:
+        first, _, last = args.years.partition('-')
+        wanted = set(range(int(first), int(last or first) + 1))
+
+    years = discover_years(args.years_dir, wanted)
+    if not years:
+        print("No EIA-860 years found.")
+        return
+
+    tasks = [
+        (year, schedule, workbook, os.path.join(args.out_dir, str(year), f"{schedule}.csv"))
+        for year, workbooks in years.items()
+        for schedule, workbook in workbooks.items()
+    ]
+    converted = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for year, schedule, csv_path, count in pool.map(convert_workbook, tasks):
+            print(f"Converted {year} {schedule}: {count} rows -> {csv_path}")
+            converted.setdefault(year, {})[schedule] = csv_path
+
+    conn = connect()
+    create_tables(conn)
+    create_history_table(conn, converted)
+
+    # Serving tables reflect the newest release only
+    latest = max(converted)
+    print(f"Loading {latest} into the serving tables")
+    for spec in LOAD_SPECS:
+        schedule = next(s for s, table in SCHEDULE_TABLES.items() if table == spec['table'])
+        reject_path = os.path.join(args.rejects_dir, f"{spec['table']}_rejects.csv")
+        if os.path.exists(reject_path):
+            os.remove(reject_path)
+        bulk_load_data(conn, converted[latest][schedule], spec['table'], spec['columns'], spec['converters'], reject_path)
+    refresh_plant_capacity(conn)
+    conn.close()
+
+    history_tasks = [(year, paths['generator']) for year, paths in sorted(converted.items())]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for year, count in pool.map(load_generator_history, history_tasks):
+            print(f"Loaded {count} generators into generator_history for {year}")
+
+
+if __name__ == "__main__":
+    main()
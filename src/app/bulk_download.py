@@ -0,0 +1,245 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter, deque
+from datetime import date
+
+import httpx
+
+from .noaa_client import NOAA_CDO_BASE_URL, REQUESTS_PER_SECOND, REQUESTS_PER_DAY, NoaaQuotaExceeded
+from .observation_store import OBSERVATION_STORE_PATH, write_observations, cdo_results_to_frame
+
+# Bulk download of CDO daily observations for many stations, datatypes and years.
+#  * Date ranges are split into calendar years, the longest range the CDO /data endpoint accepts
+#  * Each (station, chunk) is paged through with offset/limit until metadata.resultset.count
+#    is reached, so nothing is dropped after the first 1000 rows
+#  * Chunks are fetched concurrently with httpx, under one rate limiter shared by all tasks
+#  * Every finished chunk is merged into the observation store (observation_store.py) and
+#    recorded in <out-dir>/_state.jsonl with its row count per datatype; rerunning the same
+#    command skips recorded chunks, so an interrupted download picks up where it stopped.
+#    Failed chunks are listed at the end of the run; a rerun retries them.
+#
+# Usage:
+#   python -m src.app.bulk_download --stations GHCND:USW00023174 GHCND:USW00094728 \
+#       --datatypes TMAX TMIN PRCP --start 1984-01-01 --end 2023-12-31 --out-dir data/cdo
+
+PAGE_LIMIT = 1000
+MAX_ATTEMPTS = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+STATE_FILE = "_state.jsonl"
+
+
+class AsyncRateLimiter:
+    """Token bucket (per second) plus a rolling 24-hour count (per day), shared by all tasks."""
+
+    def __init__(self, per_second=REQUESTS_PER_SECOND, per_day=REQUESTS_PER_DAY):
+        self.rate = per_second
+        self.per_day = per_day
+        self._tokens = float(per_second)
+        self._updated = time.monotonic()
+        self._day = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._day and now - self._day[0] >= 86400:
+                    self._day.popleft()
+                if len(self._day) >= self.per_day:
+                    raise NoaaQuotaExceeded(f"NOAA daily quota of {self.per_day} requests used up")
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._day.append(now)
+                    return
+                # Holding the lock while waiting keeps requests in arrival order
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def year_chunks(start, end):
+    """Split [start, end] (dates, inclusive) into calendar-year ranges, the longest CDO accepts."""
+    return [
+        (max(start, date(year, 1, 1)), min(end, date(year, 12, 31)))
+        for year in range(start.year, end.year + 1)
+    ]
+
+
+def task_key(station, datatypes, start, end):
+    return f"{station}|{','.join(sorted(datatypes))}|{start.isoformat()}|{end.isoformat()}"
+
+
+def load_state(out_dir):
+    """Return the keys of chunks already downloaded into out_dir."""
+    path = os.path.join(out_dir, STATE_FILE)
+    done = set()
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["key"])
+                except (ValueError, KeyError):
+                    continue  # e.g. a line cut short by the interruption
+    return done
+
+
+async def _get(client, limiter, params, token):
+    delay = 1.0
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        await limiter.acquire()
+        try:
+            response = await client.get("data", params=params, headers={"token": token})
+        except httpx.TransportError as e:
+            if attempt == MAX_ATTEMPTS:
+                raise
+            logging.warning(f"CDO request failed ({e}), retrying in {delay:.0f}s")
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS:
+                response.raise_for_status()
+                return response.json()
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            logging.warning(f"CDO returned {response.status_code}, retrying in {delay:.0f}s")
+        await asyncio.sleep(delay)
+        delay *= 2
+
+
+async def fetch_chunk(client, limiter, token, station, datatypes, start, end, dataset="GHCND", units="metric"):
+    """
+    Fetch every observation for one station and date range (at most a year), page by page.
+
+    Returns:
+        list: CDO result dicts (date, datatype, station, attributes, value).
+    """
+    results = []
+    offset = 1  # CDO offsets are 1-based
+    while True:
+        params = [
+            ("datasetid", dataset), ("stationid", station),
+            ("startdate", start.isoformat()), ("enddate", end.isoformat()),
+            ("units", units), ("limit", PAGE_LIMIT), ("offset", offset),
+        ] + [("datatypeid", datatype) for datatype in datatypes]
+        page = await _get(client, limiter, params, token)
+        rows = page.get("results", [])
+        results.extend(rows)
+        count = page.get("metadata", {}).get("resultset", {}).get("count", 0)
+        offset += PAGE_LIMIT
+        if not rows or offset > count:
+            return results
+
+
+async def bulk_download(stations, datatypes, start, end, out_dir, concurrency=5, token=None,
+                        base_url=NOAA_CDO_BASE_URL, store_root=OBSERVATION_STORE_PATH):
+    """
+    Download observations for every station and datatype over [start, end] into out_dir.
+
+    Parameters:
+        stations (list): CDO station IDs, e.g. "GHCND:USW00023174".
+        datatypes (list): CDO datatype IDs, e.g. ["TMAX", "TMIN", "PRCP"].
+        start, end (date): Inclusive date range; split into calendar-year requests.
+        out_dir (str): Directory holding the resume state.
+        concurrency (int): Chunks fetched at once (the rate limiter still applies).
+        store_root (str): Observation store the results are written into.
+
+    Returns:
+        dict: Counts of chunks downloaded, skipped (already done) and failed.
+    """
+    token = token or os.getenv("NOAA_API_TOKEN")
+    if not token:
+        raise ValueError("NOAA API token not found. Ensure the NOAA_API_TOKEN environment variable is set.")
+
+    os.makedirs(out_dir, exist_ok=True)
+    done = load_state(out_dir)
+    tasks = [
+        (station, chunk_start, chunk_end)
+        for station in stations
+        for chunk_start, chunk_end in year_chunks(start, end)
+    ]
+    pending = [t for t in tasks if task_key(t[0], datatypes, t[1], t[2]) not in done]
+    summary = {"downloaded": 0, "skipped": len(tasks) - len(pending), "failed": 0}
+    failed = []
+    logging.info(f"{len(tasks)} chunks, {summary['skipped']} already downloaded")
+
+    limiter = AsyncRateLimiter()
+    semaphore = asyncio.Semaphore(concurrency)
+    state_path = os.path.join(out_dir, STATE_FILE)
+
+    async with httpx.AsyncClient(
+        base_url=base_url.rstrip("/") + "/",
+        timeout=httpx.Timeout(60.0, connect=10.0),
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    ) as client:
+        with open(state_path, "a", encoding="utf-8") as state:
+
+            async def run(station, chunk_start, chunk_end):
+                key = task_key(station, datatypes, chunk_start, chunk_end)
+                async with semaphore:
+                    try:
+                        rows = await fetch_chunk(client, limiter, token, station, datatypes, chunk_start, chunk_end)
+                    except NoaaQuotaExceeded:
+                        raise
+                    except Exception as e:
+                        logging.error(f"Failed {station} {chunk_start}..{chunk_end}: {e}")
+                        summary["failed"] += 1
+                        failed.append(key)
+                        return
+                    # Parquet writes are blocking, so keep them off the event loop
+                    await asyncio.to_thread(write_observations, cdo_results_to_frame(rows), store_root)
+                    # Only recorded once the rows are stored, so a crash never marks a chunk done early.
+                    # Counts per datatype tell "NOAA has none of this datatype" apart from "not fetched".
+                    counts = Counter(row["datatype"] for row in rows)
+                    state.write(json.dumps({"key": key, "rows": len(rows), "datatypes": counts}) + "\n")
+                    state.flush()
+                    summary["downloaded"] += 1
+                    missing = [datatype for datatype in datatypes if not counts.get(datatype)]
+                    note = f" (none of {', '.join(missing)})" if missing else ""
+                    logging.info(f"{station} {chunk_start}..{chunk_end}: {len(rows)} rows{note}")
+
+            jobs = [asyncio.create_task(run(*task)) for task in pending]
+            try:
+                await asyncio.gather(*jobs)
+            finally:
+                # gather() doesn't cancel the other tasks when one raises (e.g. quota used up);
+                # stop them here, before the client and the state file are closed under them
+                for job in jobs:
+                    job.cancel()
+                await asyncio.gather(*jobs, return_exceptions=True)
+                if failed:
+                    logging.warning(f"{len(failed)} chunks failed and will be retried on the next run: " + "; ".join(failed))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-download NOAA CDO daily observations, resumably.")
+    parser.add_argument('--stations', nargs='+', required=True,
+                        help="Station IDs (GHCND:...), or @file with one ID per line")
+    parser.add_argument('--datatypes', nargs='+', default=['TMAX', 'TMIN', 'PRCP'])
+    parser.add_argument('--start', type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    parser.add_argument('--end', type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    parser.add_argument('--out-dir', default=os.path.join('data', 'cdo'), help="Where the resume state is kept")
+    parser.add_argument('--store', default=OBSERVATION_STORE_PATH, help="Observation store to write into")
+    parser.add_argument('--concurrency', type=int, default=5)
+    args = parser.parse_args()
+
+    stations = []
+    for value in args.stations:
+        if value.startswith('@'):
+            with open(value[1:], 'r', encoding='utf-8') as f:
+                stations.extend(line.strip() for line in f if line.strip())
+        else:
+            stations.append(value)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    summary = asyncio.run(bulk_download(
+        stations, args.datatypes, args.start, args.end, args.out_dir, args.concurrency, store_root=args.store
+    ))
+    print(f"Downloaded {summary['downloaded']} chunks, skipped {summary['skipped']}, failed {summary['failed']}")
+
+
+if __name__ == "__main__":
+    main()
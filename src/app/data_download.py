@@ -1,6 +1,11 @@
 import os
 import requests
 
+from .noaa_client import get_client
+
+# NOAA CDO requests go through the shared client in noaa_client.py (pooled connections,
+# retries, rate limiting and a response cache).
+
 def test_download():
     return "The data_download module is working correctly!"
 
@@ -8,50 +13,18 @@ import requests
 import os
 
 def hello_noaa():
-    # Get the API token from the environment variable
-    api_token = os.getenv("NOAA_API_TOKEN")
-
-    if not api_token:
-        raise ValueError("NOAA API token not found. Ensure the NOAA_API_TOKEN environment variable is set.")
-    
-    # API endpoint
-    url = "https://www.ncei.noaa.gov/cdo-web/api/v2/datasets"
-    
-    # Headers
-    headers = {
-        "token": api_token
-    }
-    
-    # Make the request
-    response = requests.get(url, headers=headers)
-    
-    # Raise an error if the response status is not 200
-    response.raise_for_status()
-
-    # print(response.json())
-    
-    return response.json()
+    # List the CDO datasets, skipping the cache, to check the token and connectivity.
+    # Raises requests.HTTPError if the response status is not 200.
+    return get_client().get("datasets", use_cache=False)
 
 # Function to get NOAA stations by state code e.g. "CA"
 def get_stations_by_state(state: str, limit=10):
-    api_token = os.getenv("NOAA_API_TOKEN")
-    if not api_token:
-        raise ValueError("NOAA API token not found. Ensure the NOAA_API_TOKEN environment variable is set.")
-    
-    # Build the URL to query the NOAA API for stations in the given state
-    url = f"https://www.ncei.noaa.gov/cdo-web/api/v2/stations?datasetid=GHCND&locationid=FIPS:{state}&limit={limit}"
-    
-    # Set the request headers with the API token
-    headers = {'token': api_token}
-    
-    # Make the API request
-    response = requests.get(url, headers=headers)
-    
-    # Check for successful response
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Error: {response.status_code}")
+    # Query the NOAA API for stations in the given state
+    params = {"datasetid": "GHCND", "locationid": f"FIPS:{state}", "limit": limit}
+    try:
+        return get_client().get("stations", params)
+    except requests.HTTPError as e:
+        print(f"Error: {e.response.status_code}")
         return None
 
 
@@ -66,30 +39,15 @@ def get_stations_by_bbox(lon_min, lat_min, lon_max, lat_max, limit=10):
     Returns:
         dict: JSON response from the API containing station data
     """
-    # Ensure the API token is set in your environment
-    api_token = os.getenv("NOAA_API_TOKEN")
-    if not api_token:
-        raise ValueError("NOAA API token not found. Ensure the NOAA_API_TOKEN environment variable is set.")
-    
-    # Set headers with API token
-    headers = {
-        "token": api_token
+    params = {
+        "datasetid": "GHCND",
+        "extent": f"{lat_min},{lon_min},{lat_max},{lon_max}",
+        "limit": limit
     }
-    
-
-    # Define the URL with bounding box and limit
-    url = f"https://www.ncei.noaa.gov/cdo-web/api/v2/stations?datasetid=GHCND&extent={lat_min},{lon_min},{lat_max},{lon_max}&limit={limit}"
-    
-    # Make the API request
-    response = requests.get(url, headers=headers)
-
-    # print(f"NOAA response for station request: {response.json()}")
-    
-    # Check for valid response
-    if response.status_code == 200:
-        return response.json()  # Return JSON data if successful
-    else:
-        raise ValueError(f"Error {response.status_code}: {response.text}")
+    try:
+        return get_client().get("stations", params)
+    except requests.HTTPError as e:
+        raise ValueError(f"Error {e.response.status_code}: {e.response.text}")
 
 def get_weather_by_station_id(station_id, start_date, end_date, limit=1000):
     """
@@ -104,16 +62,6 @@ def get_weather_by_station_id(station_id, start_date, end_date, limit=1000):
     Returns:
         list: Weather data for the station as a list of dictionaries.
     """
-    import os
-    import requests
-
-    api_token = os.getenv("NOAA_API_TOKEN")
-    if not api_token:
-        raise ValueError("NOAA API token not found. Ensure the NOAA_API_TOKEN environment variable is set.")
-
-    headers = {"token": api_token}
-    base_url = "https://www.ncei.noaa.gov/cdo-web/api/v2/data"
-    
     weather_data = []
 
     # Prepare the query parameters
@@ -134,18 +82,23 @@ def get_weather_by_station_id(station_id, start_date, end_date, limit=1000):
     # in SF station, there was no TMIN/TMAX, only PRCP:
         # https://www.ncei.noaa.gov/cdo-web/api/v2/data?datasetid=GHCND&stationid=GHCND:US1CAMR0016&startdate=2023-01-01&enddate=2023-01-31&datatypeid=PRCP&limit=1000"
 
-    # Make the API request
-    response = requests.get(base_url, headers=headers, params=params)
-
-    # print(f"\nNOAA response for weather request: {response.json()}")
-    if response.status_code == 200:
-        weather_data.extend(response.json().get("results", []))
-    else:
-        print(f"Failed to fetch data for station {station_id}. HTTP Status: {response.status_code}")
+    # Page through the results; CDO returns at most `limit` rows per request.
+    # (For many stations or years, use bulk_download.py instead.)
+    try:
+        offset = 1
+        while True:
+            page = get_client().get("data", dict(params, offset=offset))
+            results = page.get("results", [])
+            weather_data.extend(results)
+            offset += limit
+            if not results or offset > page.get("metadata", {}).get("resultset", {}).get("count", 0):
+                break
+    except requests.HTTPError as e:
+        print(f"Failed to fetch data for station {station_id}. HTTP Status: {e.response.status_code}")
         print("headers")
-        print(response.headers)
+        print(e.response.headers)
         print("text")
-        print(response.text)
+        print(e.response.text)
 
     return weather_data
 
@@ -0,0 +1,241 @@
+import argparse
+import glob
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .observation_store import OBSERVATION_STORE_PATH, write_observations
+
+# Bulk ingestion of the official GHCN-Daily files into the observation store, for
+# analyses over far more stations than the CDO web API can deliver.
+#  * .dly files (one station per file, from ghcnd_all.tar.gz or ghcnd_hcn.tar.gz): fixed-width
+#    lines of 269 characters, one station/month/element per line with 31 day slots. Lines
+#    are read in chunks and parsed as a numpy byte matrix rather than line by line.
+#  * by_year/YYYY.csv(.gz): one observation per row for every station in a year, read with
+#    pandas in chunks. The rows are ordered by date, not station, so filtered rows are first
+#    spilled to temporary Parquet files bucketed by station (under TMPDIR), then each bucket
+#    is written to the store in one go: every station/year partition is rewritten once per
+#    input file rather than once per chunk.
+# Values are converted to the store's metric units, rows with a QC flag are dropped (unless
+# the flag is allowed), and files are processed in parallel, one worker per file. Each .dly
+# file and each by-year file covers its own station/year partitions, so workers never write
+# the same partition file.
+#
+# Usage:
+#   python -m src.app.ghcn_ingest dly ghcnd_hcn/ --elements TMAX TMIN PRCP
+#   python -m src.app.ghcn_ingest by-year by_year/2020.csv.gz by_year/2021.csv.gz --stations @stations.txt
+
+DLY_LINE = 269
+MISSING = -9999
+DEFAULT_ELEMENTS = ("TMAX", "TMIN", "PRCP")
+
+# Elements GHCN-Daily stores in tenths of a unit, per its readme.txt: °C, mm, m/s and hPa.
+# The store holds whole units, like the CDO API with units=metric. Every other element
+# (percentages, degrees, day counts, cm, km, HHMM times, weather types) is kept as is.
+TENTHS_ELEMENTS = {
+    "PRCP", "TMAX", "TMIN", "TAVG", "TOBS", "ADPT", "AWBT", "MNPN", "MXPN", "MDTN", "MDTX",
+    "EVAP", "MDEV", "MDPR", "THIC", "WESD", "WESF",
+    "AWND", "WSF1", "WSF2", "WSF5", "WSFG", "WSFI", "WSFM",
+    "ASLP", "ASTP",
+}
+# Soil temperatures, SN*# (minimum) and SX*# (maximum), also in tenths of °C
+SOIL_TEMPERATURE = r"S[NX]\d\d"
+
+BY_YEAR_COLUMNS = ["station", "date", "element", "value", "mflag", "qflag", "sflag", "obs_time"]
+SPILL_BUCKETS = 64
+
+
+def _scale(elements, values):
+    values = values.astype(np.float64)
+    tenths = np.isin(elements, list(TENTHS_ELEMENTS)) | pd.Series(elements).str.fullmatch(SOIL_TEMPERATURE).to_numpy()
+    values[tenths] /= 10.0
+    return values
+
+
+def _flags(mflag, qflag, sflag):
+    # "M,Q,S" with blanks left empty, like the CDO API's attributes field
+    joined = pd.Series(mflag).str.cat([pd.Series(qflag), pd.Series(sflag)], sep=",")
+    return joined.str.replace(" ", "", regex=False).to_numpy()
+
+
+def parse_dly_lines(lines, elements=None, allowed_qflags=""):
+    """
+    Parse .dly lines into store rows.
+
+    Parameters:
+        lines (list): Raw lines (bytes, without newlines).
+        elements (iterable): Elements to keep; None for all.
+        allowed_qflags (str): QC flags to accept besides blank (passed all checks).
+
+    Returns:
+        pd.DataFrame: Columns station, date, element, value, flags.
+    """
+    if not lines:
+        return pd.DataFrame(columns=["station", "date", "element", "value", "flags"])
+    buffer = b"".join(line[:DLY_LINE].ljust(DLY_LINE) for line in lines)
+    raw = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, DLY_LINE)
+
+    station = raw[:, 0:11].copy().view("S11").ravel().astype(str)
+    element = raw[:, 17:21].copy().view("S4").ravel().astype(str)
+    if elements is not None:
+        keep = np.isin(element, list(elements))
+        raw, station, element = raw[keep], station[keep], element[keep]
+        if len(raw) == 0:
+            return parse_dly_lines([], elements)
+
+    def number(block):
+        # Right-justified integers, possibly negative; blanks count as zero digits
+        digits = np.where((block >= 48) & (block <= 57), block - 48, 0).astype(np.int64)
+        magnitude = digits @ (10 ** np.arange(block.shape[-1] - 1, -1, -1))
+        return np.where((block == ord("-")).any(axis=-1), -magnitude, magnitude)
+
+    year = number(raw[:, 11:15])
+    month = number(raw[:, 15:17])
+
+    # 31 day slots of 8 bytes each: VALUE(5) MFLAG QFLAG SFLAG
+    days = raw[:, 21:].reshape(-1, 31, 8)
+    values = number(days[:, :, 0:5])
+    mflag = days[:, :, 5].view("S1").astype(str)
+    qflag = days[:, :, 6].view("S1").astype(str)
+    sflag = days[:, :, 7].view("S1").astype(str)
+
+    month_start = ((year - 1970) * 12 + (month - 1)).astype("datetime64[M]")
+    dates = month_start.astype("datetime64[D]")[:, None] + np.arange(31)
+    in_month = dates.astype("datetime64[M]") == month_start[:, None]
+    qc_ok = (qflag == " ") | np.isin(qflag, list(allowed_qflags))
+    valid = (values != MISSING) & in_month & qc_ok
+
+    rows, cols = np.nonzero(valid)
+    element_rows = element[rows]
+    return pd.DataFrame({
+        "station": station[rows],
+        "date": dates[rows, cols],
+        "element": element_rows,
+        "value": _scale(element_rows, values[rows, cols]),
+        "flags": _flags(mflag[rows, cols], qflag[rows, cols], sflag[rows, cols]),
+    })
+
+
+def ingest_dly_file(task):
+    """Parse one .dly file chunk by chunk into the store. Runs in a worker process."""
+    path, elements, allowed_qflags, chunk_lines, store_root = task
+    total = 0
+    with open(path, "rb") as f:
+        while True:
+            lines = [line.rstrip(b"\r\n") for line in f.readlines(chunk_lines * (DLY_LINE + 1))]
+            if not lines:
+                break
+            total += write_observations(parse_dly_lines(lines, elements, allowed_qflags), store_root)
+    return path, total
+
+
+def _spill(rows, spill_dir, batch):
+    # Bucket by station hash, so all of a station's rows end up in the same bucket
+    buckets = pd.util.hash_array(rows["station"].to_numpy()) % SPILL_BUCKETS
+    for bucket, part in rows.groupby(buckets):
+        part.to_parquet(os.path.join(spill_dir, f"{bucket:02d}-{batch:05d}.parquet"), index=False)
+
+
+def ingest_by_year_file(task):
+    """Stream one by_year CSV (optionally gzipped) into the store. Runs in a worker process."""
+    path, elements, allowed_qflags, stations, chunk_rows, store_root = task
+    total = 0
+    pending, pending_rows, batch = [], 0, 0
+    reader = pd.read_csv(
+        path, header=None, names=BY_YEAR_COLUMNS, usecols=range(7),
+        dtype={"station": str, "date": str, "element": str, "value": np.int64,
+               "mflag": str, "qflag": str, "sflag": str},
+        keep_default_na=False, chunksize=chunk_rows,
+    )
+    with tempfile.TemporaryDirectory(prefix="ghcn-ingest-") as spill_dir:
+        for chunk in reader:
+            keep = chunk["qflag"].isin([""] + list(allowed_qflags)) & (chunk["value"] != MISSING)
+            if elements is not None:
+                keep &= chunk["element"].isin(list(elements))
+            if stations is not None:
+                keep &= chunk["station"].isin(stations)
+            chunk = chunk[keep]
+            if chunk.empty:
+                continue
+            pending.append(pd.DataFrame({
+                "station": chunk["station"].to_numpy(),
+                "date": pd.to_datetime(chunk["date"], format="%Y%m%d"),
+                "element": chunk["element"].to_numpy(),
+                "value": _scale(chunk["element"].to_numpy(), chunk["value"].to_numpy()),
+                "flags": (chunk["mflag"] + "," + chunk["qflag"] + "," + chunk["sflag"]).to_numpy(),
+            }))
+            pending_rows += len(pending[-1])
+            # Collect a few chunks per spill, to keep the number of spill files down
+            if pending_rows >= 5 * chunk_rows:
+                _spill(pd.concat(pending, ignore_index=True), spill_dir, batch)
+                pending, pending_rows, batch = [], 0, batch + 1
+        if pending:
+            _spill(pd.concat(pending, ignore_index=True), spill_dir, batch)
+
+        # One bucket at a time keeps memory to about 1/SPILL_BUCKETS of the filtered file
+        for bucket in range(SPILL_BUCKETS):
+            parts = sorted(glob.glob(os.path.join(spill_dir, f"{bucket:02d}-*.parquet")))
+            if parts:
+                rows = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+                total += write_observations(rows, store_root)
+    return path, total
+
+
+def _expand(paths, pattern):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, pattern))))
+        else:
+            files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest GHCN-Daily .dly or by-year files into the observation store.")
+    parser.add_argument('kind', choices=['dly', 'by-year'])
+    parser.add_argument('paths', nargs='+', help="Files, or directories to scan (*.dly / *.csv*)")
+    parser.add_argument('--elements', nargs='+', default=list(DEFAULT_ELEMENTS), help="Elements to keep ('all' for every element)")
+    parser.add_argument('--stations', nargs='+',
+                        help="by-year only: station IDs to keep, or @file with one ID per line (default: all)")
+    parser.add_argument('--allow-qflags', default='', help="QC flags to accept besides blank, e.g. 'O' to keep outlier-flagged values")
+    parser.add_argument('--chunk', type=int, default=200000, help="Lines (.dly) or rows (by-year) per chunk")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument('--store', default=OBSERVATION_STORE_PATH, help="Observation store to write into")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    elements = None if args.elements == ['all'] else args.elements
+
+    if args.kind == 'dly':
+        files = _expand(args.paths, '*.dly')
+        tasks = [(path, elements, args.allow_qflags, args.chunk, args.store) for path in files]
+        worker = ingest_dly_file
+    else:
+        stations = None
+        if args.stations:
+            stations = []
+            for value in args.stations:
+                if value.startswith('@'):
+                    with open(value[1:], 'r', encoding='utf-8') as f:
+                        stations.extend(line.strip().split(':', 1)[-1] for line in f if line.strip())
+                else:
+                    stations.append(value.split(':', 1)[-1])
+        files = _expand(args.paths, '*.csv*')
+        tasks = [(path, elements, args.allow_qflags, stations, args.chunk, args.store) for path in files]
+        worker = ingest_by_year_file
+
+    total = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for path, count in pool.map(worker, tasks):
+            logging.info(f"{path}: {count} observations")
+            total += count
+    print(f"Ingested {total} observations from {len(files)} files into {args.store}")
+
+
+if __name__ == "__main__":
+    main()
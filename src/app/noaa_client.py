@@ -0,0 +1,244 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared client for the NOAA Climate Data Online (CDO) v2 API.
+#  * One pooled requests.Session, with timeouts, instead of a fresh connection per call
+#  * Retries (backoff, Retry-After) on connection errors and 429/5xx, each attempt going
+#    through the rate limiter so retries count against the quota too
+#  * A token bucket matching CDO's quotas (5 requests/second, 10,000/day per token)
+#  * A persistent SQLite response cache keyed by endpoint + parameters, with a TTL and
+#    least-recently-used eviction past a size limit, so map pans over the same area
+#    don't spend quota
+# Set NOAA_CDO_BASE_URL to point it at a local stand-in server for testing.
+
+NOAA_CDO_BASE_URL = os.getenv("NOAA_CDO_BASE_URL", "https://www.ncei.noaa.gov/cdo-web/api/v2")
+NOAA_CACHE_PATH = os.getenv("NOAA_CACHE_PATH", os.path.join("data", "noaa_cache.sqlite"))
+NOAA_CACHE_TTL_S = float(os.getenv("NOAA_CACHE_TTL_S", str(24 * 3600)))
+NOAA_CACHE_MAX_MB = float(os.getenv("NOAA_CACHE_MAX_MB", "256"))
+
+REQUESTS_PER_SECOND = 5
+REQUESTS_PER_DAY = 10000
+TIMEOUT = (5, 30)  # connect, read (seconds)
+MAX_ATTEMPTS = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class NoaaQuotaExceeded(RuntimeError):
+    pass
+
+
+class RateLimiter:
+    """
+    Token bucket for the per-second limit plus a rolling 24-hour count for the daily one.
+
+    acquire() sleeps until a per-second token is free, but raises NoaaQuotaExceeded
+    rather than blocking for hours when the daily quota is used up.
+    """
+
+    def __init__(self, per_second=REQUESTS_PER_SECOND, per_day=REQUESTS_PER_DAY):
+        self.rate = per_second
+        self.capacity = per_second
+        self.per_day = per_day
+        self._tokens = float(per_second)
+        self._updated = time.monotonic()
+        self._day = deque()  # monotonic times of requests in the last 24 hours
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._day and now - self._day[0] >= 86400:
+                    self._day.popleft()
+                if len(self._day) >= self.per_day:
+                    raise NoaaQuotaExceeded(f"NOAA daily quota of {self.per_day} requests used up")
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._day.append(now)
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    @property
+    def used_today(self):
+        return len(self._day)
+
+
+class ResponseCache:
+    """SQLite-backed cache of decoded JSON responses with a TTL and a size cap."""
+
+    def __init__(self, path=NOAA_CACHE_PATH, ttl_s=NOAA_CACHE_TTL_S, max_bytes=NOAA_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)")
+
+    @contextmanager
+    def _connect(self):
+        # A connection per call keeps this safe across Flask's worker threads. sqlite3's own
+        # context manager only commits, so close explicitly.
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_s:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        body = json.dumps(value).encode("utf-8")
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, body, size, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, body, len(body), now, now)
+            )
+            db.execute("DELETE FROM responses WHERE stored_at < ?", (now - self.ttl_s,))
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                # Drop least recently used entries until back under the cap
+                for old_key, size in db.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at"
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    db.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                    total -= size
+
+    def clear(self):
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM responses")
+
+
+class NoaaClient:
+    def __init__(self, token=None, base_url=NOAA_CDO_BASE_URL, cache=None, limiter=None, pool_size=10):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache if cache is not None else ResponseCache()
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.session = requests.Session()
+        # No adapter-level retries: they would bypass the rate limiter (see _request)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _token(self):
+        token = self.token or os.getenv("NOAA_API_TOKEN")
+        if not token:
+            raise ValueError("NOAA API token not found. Ensure the NOAA_API_TOKEN environment variable is set.")
+        return token
+
+    @staticmethod
+    def cache_key(endpoint, params):
+        # Repeated parameters (e.g. datatypeid) are order-insensitive; the token is left out
+        items = sorted(
+            (name, str(v))
+            for name, value in (params or {}).items()
+            for v in (value if isinstance(value, (list, tuple)) else [value])
+        )
+        return hashlib.sha256(json.dumps([endpoint, items]).encode("utf-8")).hexdigest()
+
+    def _request(self, endpoint, params):
+        # Every attempt, retries included, takes a rate limiter token and counts toward the daily quota
+        token = self._token()
+        delay = 1.0
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self.limiter.acquire()
+            try:
+                response = self.session.get(
+                    f"{self.base_url}/{endpoint.lstrip('/')}", params=params, headers={"token": token}, timeout=TIMEOUT
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                logging.warning(f"NOAA {endpoint} request failed ({e}), retrying in {delay:.0f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+                logging.warning(f"NOAA {endpoint} returned {response.status_code}, retrying in {delay:.0f}s")
+            time.sleep(delay)
+            delay *= 2
+
+    def get(self, endpoint, params=None, use_cache=True):
+        """
+        GET a CDO endpoint and return the decoded JSON.
+
+        Parameters:
+            endpoint (str): Path under the API root, e.g. "stations" or "data".
+            params (dict): Query parameters; list values are sent as repeated parameters.
+            use_cache (bool): Read and write the response cache.
+
+        Returns:
+            dict: Response JSON (CDO answers {} when nothing matches).
+
+        Raises:
+            requests.HTTPError: for error responses left after retries.
+            NoaaQuotaExceeded: when the daily quota is used up.
+        """
+        key = self.cache_key(endpoint, params)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self._request(endpoint, params)
+        if response.status_code != 200:
+            logging.warning(f"NOAA {endpoint} returned {response.status_code}: {response.text[:200]}")
+        response.raise_for_status()
+        data = response.json()
+        if use_cache:
+            self.cache.put(key, data)
+        return data
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide NoaaClient, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = NoaaClient()
+        return _client
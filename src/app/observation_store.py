@@ -0,0 +1,211 @@
+import fcntl
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Local store of daily weather observations, so analyses and map lookups read them from
+# disk instead of re-downloading from NOAA or re-parsing CSVs.
+#
+# Layout: Parquet, hive-partitioned by station and year, one file per partition:
+#   <root>/station=USW00023050/year=2023/data.parquet
+# Rows are long-format (station, date, element, value, flags). Values are metric, as
+# the CDO API returns them with units=metric: temperatures in °C, precipitation and
+# snow in mm.
+#
+# read_observations() pushes station, date range and element filters down to pyarrow:
+# the station and year partitions prune whole directories, and the date/element
+# predicates use the Parquet row-group statistics.
+
+OBSERVATION_STORE_PATH = os.getenv("OBSERVATION_STORE_PATH", os.path.join("data", "observations"))
+
+SCHEMA = pa.schema([
+    ("station", pa.string()),
+    ("date", pa.date32()),
+    ("element", pa.string()),
+    ("value", pa.float64()),
+    ("flags", pa.string()),
+])
+# What each partition file holds; station and year come from the directory names
+FILE_SCHEMA = pa.schema([field for field in SCHEMA if field.name != "station"])
+PARTITIONING = ds.partitioning(pa.schema([("station", pa.string()), ("year", pa.int32())]), flavor="hive")
+
+# Elements stored in inches (°F for temperatures) in CDO "standard" units CSV exports
+_INCH_ELEMENTS = {"PRCP", "SNOW", "SNWD"}
+_FAHRENHEIT_ELEMENTS = {"TMAX", "TMIN", "TAVG", "TOBS"}
+_IMPORTS_FILE = "_imports.json"
+# Beside each data.parquet; the leading dot keeps pyarrow's dataset discovery from reading it
+_LOCK_FILE = ".lock"
+
+
+def normalize_station(station):
+    """Strip the dataset prefix CDO puts on station IDs ("GHCND:USW00023050" -> "USW00023050")."""
+    return station.split(":", 1)[-1]
+
+
+def _partition_path(root, station, year):
+    return os.path.join(root, f"station={station}", f"year={year}", "data.parquet")
+
+
+@contextmanager
+def _partition_lock(directory):
+    # flock rather than a threading.Lock: the Flask app, bulk_download and ghcn_ingest are
+    # separate processes merging into the same partitions. It also excludes threads, since
+    # every call opens the lock file afresh.
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, _LOCK_FILE), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_observations(df, root=OBSERVATION_STORE_PATH):
+    """
+    Merge observations into the store, replacing existing rows with the same station, date and element.
+
+    Parameters:
+        df (pd.DataFrame): Columns station, date, element, value and optionally flags.
+        root (str): Store directory.
+
+    Returns:
+        int: Number of rows written.
+    """
+    if df.empty:
+        return 0
+    df = df.copy()
+    if "flags" not in df:
+        df["flags"] = None
+    df["station"] = df["station"].map(normalize_station)
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    df = df[list(SCHEMA.names)]
+
+    # Each partition is read, merged and rewritten whole, under a lock on that partition
+    for (station, year), part in df.groupby([df["station"], pd.to_datetime(df["date"]).dt.year]):
+        path = _partition_path(root, station, year)
+        part = part[list(FILE_SCHEMA.names)]
+        with _partition_lock(os.path.dirname(path)):
+            if os.path.exists(path):
+                existing = pq.read_table(path, schema=FILE_SCHEMA).to_pandas()
+                part = pd.concat([existing, part], ignore_index=True)
+            part = part.drop_duplicates(["date", "element"], keep="last").sort_values(["date", "element"])
+            table = pa.Table.from_pandas(part, schema=FILE_SCHEMA, preserve_index=False)
+
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".parquet")
+            os.close(fd)
+            try:
+                pq.write_table(table, tmp_path, compression="zstd")
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    return len(df)
+
+
+def read_observations(stations=None, start=None, end=None, elements=None, root=OBSERVATION_STORE_PATH):
+    """
+    Read observations from the store, filtering as early as possible.
+
+    Parameters:
+        stations (list): Station IDs (with or without the "GHCND:" prefix); None for all.
+        start, end (date or str): Inclusive date range; None for unbounded.
+        elements (list): Elements such as ["TMAX", "TMIN"]; None for all.
+        root (str): Store directory.
+
+    Returns:
+        pd.DataFrame: Columns station, date, element, value, flags, sorted by station and date.
+    """
+    empty = SCHEMA.empty_table().to_pandas()
+    if not os.path.isdir(root):
+        return empty
+
+    dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+    conditions = []
+    if stations is not None:
+        conditions.append(ds.field("station").isin([normalize_station(s) for s in stations]))
+    if start is not None:
+        start = pd.Timestamp(start).date()
+        conditions.append(ds.field("year") >= start.year)
+        conditions.append(ds.field("date") >= pa.scalar(start, pa.date32()))
+    if end is not None:
+        end = pd.Timestamp(end).date()
+        conditions.append(ds.field("year") <= end.year)
+        conditions.append(ds.field("date") <= pa.scalar(end, pa.date32()))
+    if elements is not None:
+        conditions.append(ds.field("element").isin(list(elements)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    table = dataset.to_table(columns=list(SCHEMA.names), filter=expression)
+    if table.num_rows == 0:
+        return empty
+    return table.to_pandas().sort_values(["station", "date", "element"], ignore_index=True)
+
+
+def daily_table(stations=None, start=None, end=None, elements=None, root=OBSERVATION_STORE_PATH):
+    """
+    Read observations as one row per station and day, one column per element.
+
+    Returns:
+        pd.DataFrame: Columns STATION, DATE (datetime64) and one column per element.
+    """
+    long = read_observations(stations, start, end, elements, root)
+    if long.empty:
+        return pd.DataFrame(columns=["STATION", "DATE"] + list(elements or []))
+    wide = long.pivot_table(index=["station", "date"], columns="element", values="value", aggfunc="last")
+    wide = wide.reset_index().rename(columns={"station": "STATION", "date": "DATE"})
+    wide.columns.name = None
+    wide["DATE"] = pd.to_datetime(wide["DATE"])
+    return wide
+
+
+def cdo_results_to_frame(results):
+    """Convert CDO /data results (dicts with date, station, datatype, value, attributes) to store rows."""
+    df = pd.DataFrame(results, columns=["date", "station", "datatype", "value", "attributes"])
+    return df.rename(columns={"datatype": "element", "attributes": "flags"})
+
+
+def import_cdo_csv(path, root=OBSERVATION_STORE_PATH):
+    """
+    Import a CDO daily-summaries CSV export (standard units, one column per element) into
+    the store, unless this exact file (same size and mtime) was imported before.
+
+    Returns:
+        list: Station IDs in the file.
+    """
+    imports_path = os.path.join(root, _IMPORTS_FILE)
+    imports = {}
+    if os.path.exists(imports_path):
+        with open(imports_path, "r", encoding="utf-8") as f:
+            imports = json.load(f)
+    stat = os.stat(path)
+    fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+    previous = imports.get(os.path.abspath(path))
+    if previous and previous["fingerprint"] == fingerprint:
+        return previous["stations"]
+
+    wide = pd.read_csv(path)
+    elements = [col for col in wide.columns if col in _INCH_ELEMENTS | _FAHRENHEIT_ELEMENTS]
+    long = wide.melt(id_vars=["STATION", "DATE"], value_vars=elements, var_name="element", value_name="value")
+    long = long.dropna(subset=["value"])
+    # Store metric values, like the CDO API with units=metric
+    fahrenheit = long["element"].isin(_FAHRENHEIT_ELEMENTS)
+    long.loc[fahrenheit, "value"] = (long.loc[fahrenheit, "value"] - 32) * 5 / 9
+    inches = long["element"].isin(_INCH_ELEMENTS)
+    long.loc[inches, "value"] = long.loc[inches, "value"] * 25.4
+    write_observations(long.rename(columns={"STATION": "station", "DATE": "date"}), root)
+
+    stations = sorted(wide["STATION"].astype(str).unique())
+    imports[os.path.abspath(path)] = {"fingerprint": fingerprint, "stations": stations}
+    os.makedirs(root, exist_ok=True)
+    with open(imports_path, "w", encoding="utf-8") as f:
+        json.dump(imports, f, indent=2)
+    return stations
@@ -116,47 +116,38 @@ var heatLayerRadius = 25;
 var heatLayerBlur = 15;
 var heatLayerMaxZoom = 17;
 
-// Function to render the heatmap based on filtered plants data.
+// Function to render the heatmap from the server-side capacity grid.
+// The FastAPI /plants/heatmap endpoint bins plant capacity for the current view
+// (optionally restricted to the selected technologies), so the browser only
+// receives a few thousand weighted cells instead of every plant record.
 function renderHeatmap() {
-  // Remove the existing heatLayer if present.
-  if (heatLayer) {
-    map.removeLayer(heatLayer);
-  }
-  
-  const selectedTech = getSelectedTechs();
-  let heatPoints = [];
-  plantsData.forEach(plant => {
-    const plantTechs = Object.keys(plant.tech_breakdown);
-    // If a tech filter is active and the plant does not contain any of the selected techs, skip it.
-    if (selectedTech.length > 0 && !selectedTech.some(tech => plantTechs.includes(tech))) {
-      return;
-    }
-    
-    let weight = 0;
-    if (selectedTech.length > 0) {
-      // Sum up only the capacities of the selected technologies.
-      for (const [tech, cap] of Object.entries(plant.tech_breakdown)) {
-        if (selectedTech.includes(tech)) {
-          weight += cap;
-        }
-      }
-    } else {
-      // If no filter is applied, use the plant's total capacity.
-      weight = plant.total_capacity_mw;
-    }
-    
-    // If the weight is 0, you may want to skip it.
-    if (weight > 0) {
-      heatPoints.push([plant.latitude, plant.longitude, weight]);
-    }
+  const bounds = map.getBounds();
+  const params = new URLSearchParams({
+    bbox: `${bounds.getWest()},${bounds.getSouth()},${bounds.getEast()},${bounds.getNorth()}`,
+    zoom: map.getZoom()
   });
-  
-  // Create the heatLayer using the filtered points.
-  heatLayer = L.heatLayer(heatPoints, {
-    radius: heatLayerRadius,
-    blur: heatLayerBlur,
-    maxZoom: heatLayerMaxZoom
-  }).addTo(map);
+  getSelectedTechs().forEach(tech => params.append('technology', tech));
+
+  return fetch(`${FASTAPI_BASE_URL}/plants/heatmap?${params}`)
+    .then(response => {
+      if (!response.ok) {
+        return response.json().then(err => { throw new Error(err.detail); });
+      }
+      return response.json();
+    })
+    .then(data => {
+      // Remove the existing heatLayer if present.
+      if (heatLayer) {
+        map.removeLayer(heatLayer);
+      }
+      // Each cell is [lat, lng, capacity], placed at the capacity-weighted centroid of its plants.
+      heatLayer = L.heatLayer(data.cells, {
+        radius: heatLayerRadius,
+        blur: heatLayerBlur,
+        maxZoom: heatLayerMaxZoom
+      }).addTo(map);
+    })
+    .catch(error => console.error('Error fetching heatmap:', error));
 }
 
 const controlSection = L.control({ position: 'topright' });
@@ -232,9 +223,14 @@ document.getElementById('toggle-tech-btn').addEventListener('click', function()
 });
 
 // Apply the filter when the "Apply Filter" button is clicked.
-document.getElementById('apply-tech-filter').addEventListener('click', function() {
+document.getElementById('apply-tech-filter').addEventListener('click', async function() {
+  if (markersVisible) {
+    await fetchPowerPlants(map.getBounds());
+  }
   renderPlantMarkers();
-  renderHeatmap();
+  if (heatmapVisible) {
+    renderHeatmap();
+  }
   // Hide panel after applying
   document.getElementById('tech-selector-container').style.display = 'none';
 });
@@ -252,6 +248,9 @@ function fetchWeatherStations(bounds) {
     .then(data => {
       weatherStationsLayer.clearLayers();
       const results = data.results || [];
+      if (data.metadata && data.metadata.truncated) {
+        console.info(`Showing ${results.length} of ${data.metadata.resultset.count} weather stations; zoom in for the rest`);
+      }
       results.forEach(station => {
         const marker = L.marker([station.latitude, station.longitude]);
         marker.bindPopup(`<b>Station:</b> ${station.name}`);
@@ -267,10 +266,41 @@ const FASTAPI_BASE_URL = "http://127.0.0.1:8000";
 // Global variable that holds the fetched plants data.
 var plantsData = [];
 
+// Rebuild plant objects from a /plants?format=columnar response (parallel arrays, with each
+// plant's technologies at tech_offsets[i]..tech_offsets[i + 1] in tech_ids/tech_capacity_mw).
+function plantsFromColumns(data) {
+  const plants = new Array(data.plant_code.length);
+  for (let i = 0; i < plants.length; i++) {
+    const tech_breakdown = {};
+    for (let k = data.tech_offsets[i]; k < data.tech_offsets[i + 1]; k++) {
+      tech_breakdown[data.technologies[data.tech_ids[k]]] = data.tech_capacity_mw[k];
+    }
+    plants[i] = {
+      plant_code: data.plant_code[i],
+      plant_name: data.plant_name[i],
+      latitude: data.latitude[i],
+      longitude: data.longitude[i],
+      utility_name: data.utility_name[i],
+      tech_breakdown: tech_breakdown,
+      total_capacity_mw: data.total_capacity_mw[i],
+    };
+  }
+  return plants;
+}
+
 // Fetch power plants and store the resulting data in plantsData.
+// The selected technologies are filtered on the server, so only matching plants are sent.
 function fetchPowerPlants(bounds) {
   const { _southWest, _northEast } = bounds;
-  return fetch(`${FASTAPI_BASE_URL}/plants?southWestLat=${_southWest.lat}&southWestLng=${_southWest.lng}&northEastLat=${_northEast.lat}&northEastLng=${_northEast.lng}`)
+  const params = new URLSearchParams({
+    southWestLat: _southWest.lat,
+    southWestLng: _southWest.lng,
+    northEastLat: _northEast.lat,
+    northEastLng: _northEast.lng,
+    format: 'columnar'
+  });
+  getSelectedTechs().forEach(tech => params.append('technology', tech));
+  return fetch(`${FASTAPI_BASE_URL}/plants?${params}`)
     .then(response => {
       if (!response.ok) {
         return response.json().then(err => { throw new Error(err.detail); });
@@ -278,10 +308,12 @@ function fetchPowerPlants(bounds) {
       return response.json();
     })
     .then(data => {
-      plantsData = data;
-      return data;
+      plantsData = plantsFromColumns(data);
+      return plantsData;
     })
     .catch(error => {
+      // e.g. 404 when no plants in view match the filter; don't keep showing the old ones
+      plantsData = [];
       console.error('Error fetching power plants:', error);
     });
 }
@@ -294,29 +326,18 @@ async function updateMapLayers() {
   } else {
     weatherStationsLayer.clearLayers();
   }
-  // Update power plant layers only if markers or heatmap are visible.
-  if (markersVisible || heatmapVisible) {
+  // Update plant markers layer.
+  if (markersVisible) {
     await fetchPowerPlants(map.getBounds());
-    // Update plant markers layer.
-    if (markersVisible) {
-      renderPlantMarkers();
-    } else {
-      plantsCluster.clearLayers();
-    }
-    // Update heatLayer.
-    if (heatmapVisible) {
-      renderHeatmap();
-    } else {
-      if (heatLayer) {
-        map.removeLayer(heatLayer);
-      }
-    }
+    renderPlantMarkers();
   } else {
-    // Neither markers nor heatmap are active—ensure corresponding layers are removed.
     plantsCluster.clearLayers();
-    if (heatLayer) {
-      map.removeLayer(heatLayer);
-    }
+  }
+  // Update heatLayer.
+  if (heatmapVisible) {
+    renderHeatmap();
+  } else if (heatLayer) {
+    map.removeLayer(heatLayer);
   }
 }
 
@@ -0,0 +1,214 @@
+import argparse
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+import requests
+
+# Local catalog of GHCN-Daily stations for /weather-stations.
+# The station list comes from NOAA's fixed-width ghcnd-stations.txt and is stored as a
+# compressed .npz of parallel numpy arrays, sorted by 1-degree grid cell with a CSR-style
+# offsets array over the cells. A bbox lookup is then a handful of contiguous slices (one
+# per row of cells) plus an exact mask, with no call to the CDO API.
+# A zoomed-out view can hold most of the ~125k stations, more markers than a map can draw,
+# so results are capped at STATION_QUERY_LIMIT. Past the cap they are thinned evenly across
+# grid cells (each cell's first station, then each cell's second, ...) and the response
+# metadata says so.
+#
+# Refresh it with:  python -m src.app.station_catalog [--url URL] [--out PATH]
+
+GHCND_STATIONS_URL = "https://www.ncei.noaa.gov/pub/data/ghcn/daily/ghcnd-stations.txt"
+STATION_CATALOG_PATH = os.getenv("STATION_CATALOG_PATH", os.path.join("data", "ghcnd_stations.npz"))
+STATION_QUERY_LIMIT = int(os.getenv("STATION_QUERY_LIMIT", "2000"))
+
+CELL_DEG = 1.0
+N_ROWS = int(180 / CELL_DEG) + 1  # latitude 90 gets a row of its own
+N_COLS = int(360 / CELL_DEG) + 1
+
+# Column positions (0-based, end exclusive) from NOAA's readme for ghcnd-stations.txt
+FIELDS = {
+    "id": (0, 11),
+    "latitude": (12, 20),
+    "longitude": (21, 30),
+    "elevation": (31, 37),
+    "state": (38, 40),
+    "name": (41, 71),
+}
+
+
+def _cells(lat, lon):
+    rows = np.clip(np.floor((lat + 90) / CELL_DEG).astype(np.int64), 0, N_ROWS - 1)
+    cols = np.clip(np.floor((lon + 180) / CELL_DEG).astype(np.int64), 0, N_COLS - 1)
+    return rows * N_COLS + cols
+
+
+def parse_stations(path):
+    """
+    Parse ghcnd-stations.txt into arrays.
+
+    Returns:
+        dict: Column name -> numpy array (id, state, name as strings; latitude, longitude,
+            elevation as float64).
+    """
+    columns = {name: [] for name in FIELDS}
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if len(line.strip()) < FIELDS["longitude"][1]:
+                continue
+            for name, (start, end) in FIELDS.items():
+                columns[name].append(line[start:end].strip())
+    arrays = {
+        "id": np.array(columns["id"], dtype="U11"),
+        "latitude": np.array(columns["latitude"], dtype=np.float64),
+        "longitude": np.array(columns["longitude"], dtype=np.float64),
+        "elevation": np.array(columns["elevation"], dtype=np.float64),
+        "state": np.array(columns["state"], dtype="U2"),
+        "name": np.array(columns["name"], dtype="U30"),
+    }
+    # -999.9 marks a missing elevation
+    arrays["elevation"][arrays["elevation"] <= -999] = np.nan
+    return arrays
+
+
+def build_catalog(arrays, out_path):
+    """Sort the station arrays by grid cell, add the cell offsets and write them to out_path atomically."""
+    cells = _cells(arrays["latitude"], arrays["longitude"])
+    order = np.argsort(cells, kind="stable")
+    sorted_arrays = {name: values[order] for name, values in arrays.items()}
+    offsets = np.searchsorted(cells[order], np.arange(N_ROWS * N_COLS + 1)).astype(np.int32)
+
+    out_dir = os.path.dirname(out_path) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=".npz")
+    os.close(fd)
+    try:
+        np.savez_compressed(tmp_path, offsets=offsets, **sorted_arrays)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(order)
+
+
+def sync_catalog(url=GHCND_STATIONS_URL, out_path=STATION_CATALOG_PATH):
+    """Download ghcnd-stations.txt and rebuild the catalog. Returns the number of stations."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        txt_path = os.path.join(tmp_dir, "ghcnd-stations.txt")
+        with requests.get(url, stream=True, timeout=(10, 120)) as response:
+            response.raise_for_status()
+            with open(txt_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+        return build_catalog(parse_stations(txt_path), out_path)
+
+
+class StationCatalog:
+    def __init__(self, path=STATION_CATALOG_PATH):
+        self.path = path
+        self._data = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return os.path.exists(self.path)
+
+    def _load(self):
+        # Reload when a sync has replaced the file
+        mtime = os.path.getmtime(self.path)
+        with self._lock:
+            if self._data is None or mtime != self._mtime:
+                with np.load(self.path) as npz:
+                    self._data = {name: npz[name] for name in npz.files}
+                self._mtime = mtime
+                logging.info(f"Loaded station catalog: {len(self._data['id'])} stations")
+            return self._data
+
+    def _indices(self, data, south, west, north, east):
+        row0, row1 = (int(np.clip(np.floor((v + 90) / CELL_DEG), 0, N_ROWS - 1)) for v in (south, north))
+        col0, col1 = (int(np.clip(np.floor((v + 180) / CELL_DEG), 0, N_COLS - 1)) for v in (west, east))
+        offsets = data["offsets"]
+        # Cells are stored row-major, so each row's span of columns is one contiguous slice
+        slices = [
+            np.arange(offsets[row * N_COLS + col0], offsets[row * N_COLS + col1 + 1])
+            for row in range(row0, row1 + 1)
+        ]
+        candidates = np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+        lat, lon = data["latitude"][candidates], data["longitude"][candidates]
+        mask = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        return candidates[mask]
+
+    @staticmethod
+    def _thin(data, indices, limit):
+        # Round-robin over grid cells, so sparse areas keep their stations and dense ones
+        # are sampled, instead of returning whichever cells come first
+        cells = _cells(data["latitude"][indices], data["longitude"][indices])
+        order = np.argsort(cells, kind="stable")
+        sorted_cells = cells[order]
+        first = np.searchsorted(sorted_cells, sorted_cells, side="left")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order)) - first
+        keep = np.lexsort((cells, rank))[:limit]
+        return indices[np.sort(keep)]
+
+    def query(self, south, west, north, east, limit=STATION_QUERY_LIMIT):
+        """
+        Return the stations inside a bounding box, in the CDO /stations response shape.
+
+        A west greater than east is taken as a box crossing the antimeridian. When more than
+        limit stations match, an evenly spread subset of limit stations is returned.
+
+        Returns:
+            dict: {"metadata": {"resultset": {...}, "truncated": bool}, "results": [station dicts]},
+                where resultset.count is the number of matching stations.
+        """
+        data = self._load()
+        if west > east:
+            indices = np.concatenate([
+                self._indices(data, south, west, north, 180.0),
+                self._indices(data, south, -180.0, north, east),
+            ])
+        else:
+            indices = self._indices(data, south, west, north, east)
+        matched = len(indices)
+        truncated = matched > limit
+        if truncated:
+            indices = self._thin(data, indices, limit)
+        results = [
+            {
+                "id": f"GHCND:{data['id'][i]}",
+                "name": str(data["name"][i]),
+                "state": str(data["state"][i]),
+                "latitude": float(data["latitude"][i]),
+                "longitude": float(data["longitude"][i]),
+                "elevation": None if np.isnan(data["elevation"][i]) else float(data["elevation"][i]),
+            }
+            for i in indices
+        ]
+        return {
+            "metadata": {"resultset": {"offset": 1, "count": matched, "limit": limit}, "truncated": truncated},
+            "results": results,
+        }
+
+
+station_catalog = StationCatalog()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download the GHCN-Daily station list and rebuild the local catalog.")
+    parser.add_argument('--url', default=GHCND_STATIONS_URL, help="ghcnd-stations.txt URL")
+    parser.add_argument('--file', help="Build from a local ghcnd-stations.txt instead of downloading")
+    parser.add_argument('--out', default=STATION_CATALOG_PATH, help="Catalog (.npz) to write")
+    args = parser.parse_args()
+
+    if args.file:
+        count = build_catalog(parse_stations(args.file), args.out)
+    else:
+        count = sync_catalog(args.url, args.out)
+    print(f"Wrote {count} stations to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
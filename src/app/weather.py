@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify
 import os
 import requests
 from .data_download import get_stations_by_bbox, get_weather_by_station_id
+from .observation_store import read_observations, write_observations, cdo_results_to_frame
+from .station_catalog import station_catalog
 
 # API endpoints for weather data from NOAA API
 
@@ -18,13 +20,22 @@ def weather_stations():
         return jsonify({"error": "Missing bounding box coordinates"}), 400
 
     try:
-        stations = get_stations_by_bbox(
-            lon_min=float(south_west_lng),
-            lat_min=float(south_west_lat),
-            lon_max=float(north_east_lng),
-            lat_max=float(north_east_lat),
-            limit=100
-        )
+        if station_catalog.available:
+            # Local GHCND catalog (see station_catalog.py): no NOAA round-trip. Capped at
+            # STATION_QUERY_LIMIT stations, thinned evenly; metadata.truncated says when.
+            stations = station_catalog.query(
+                float(south_west_lat), float(south_west_lng), float(north_east_lat), float(north_east_lng)
+            )
+            if not stations["results"]:
+                stations = None
+        else:
+            stations = get_stations_by_bbox(
+                lon_min=float(south_west_lng),
+                lat_min=float(south_west_lat),
+                lon_max=float(north_east_lng),
+                lat_max=float(north_east_lat),
+                limit=100
+            )
         if not stations:
             return jsonify({"message": "No stations found in the current map view"}), 200
 
@@ -59,8 +70,16 @@ def fetch_weather_info():
         station_id = stations['results'][0]['id']
         start_date = '2022-01-01'
         end_date = '2022-01-02'
-        weather_data = get_weather_by_station_id(station_id, start_date=start_date, end_date=end_date)
-        precipitation = weather_data[0]['value']
+        # Read from the local observation store, fetching from NOAA (and storing) only on a miss
+        observations = read_observations([station_id], start_date, end_date, ["PRCP"])
+        if observations.empty:
+            fetched = cdo_results_to_frame(get_weather_by_station_id(station_id, start_date=start_date, end_date=end_date))
+            write_observations(fetched)
+            observations = fetched[fetched['element'] == 'PRCP']
+        if observations.empty:
+            return jsonify({"error": "No precipitation data found"}), 404
+        # Earliest PRCP value, whether it came from the store or from NOAA
+        precipitation = float(observations.sort_values('date')['value'].iloc[0])
         return jsonify({"precipitation": precipitation})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
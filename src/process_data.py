@@ -1,15 +1,19 @@
 import pandas as pd
 # 
-def process_climate_data(input_file):
-    # Step 1: Load the data
-    data = pd.read_csv(input_file)
+def process_climate_data(input_file, units="standard"):
+    # Step 1: Load the data (a CSV path, or a DataFrame such as observation_store.daily_table())
+    data = input_file.copy() if isinstance(input_file, pd.DataFrame) else pd.read_csv(input_file)
 
     # Step 2: Drop rows with missing TMAX or TMIN
     data = data.dropna(subset=["TMAX", "TMIN"])
 
-    # Step 3: Convert Fahrenheit to Celsius
-    data["TMAX_C"] = (data["TMAX"] - 32) * 5 / 9
-    data["TMIN_C"] = (data["TMIN"] - 32) * 5 / 9
+    # Step 3: Convert Fahrenheit to Celsius ("metric" data is in Celsius already)
+    if units == "metric":
+        data["TMAX_C"] = data["TMAX"]
+        data["TMIN_C"] = data["TMIN"]
+    else:
+        data["TMAX_C"] = (data["TMAX"] - 32) * 5 / 9
+        data["TMIN_C"] = (data["TMIN"] - 32) * 5 / 9
 
     # Step 4: Add derived columns
     data["TAVG_C"] = (data["TMAX_C"] + data["TMIN_C"]) / 2